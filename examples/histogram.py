@@ -1,6 +1,6 @@
 import tempfile
 
-from presentation import Presentation
+from presentation import Presentation, Viewport
 
 
 def main() -> None:
@@ -32,16 +32,10 @@ def main() -> None:
 
         for histogram in histograms:
             values = histogram["values"]
-            max_value = max(values)
-            rectangles = []
+            viewport = Viewport(limits=(0, 0, len(values), max(values)), rect=(x0, y0, bar_width * len(values), height))
+            rectangles = [{"x": i, "y": 0, "w": 1, "h": value, "fill": histogram["fill"], "stroke": histogram["stroke"]} for i, value in enumerate(values)]
 
-            for i, value in enumerate(values):
-                bar_height = value / max_value * height
-                x = x0 + i * bar_width
-                y = y0 + height - bar_height
-                rectangles.append({"x": x, "y": y, "w": bar_width, "h": bar_height, "fill": histogram["fill"], "stroke": histogram["stroke"]})
-
-            presentation.add_rectangles(rectangles=rectangles)
+            presentation.add_rectangles(rectangles=rectangles, viewport=viewport)
             presentation.add_rectangle({"x": x0 - 0.5, "y": y0 - 0.5, "w": bar_width * len(values) + 1, "h": height + 0.5, "stroke": "#222", "radius": 0.07})
             y0 += height + 1
 
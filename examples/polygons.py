@@ -1,7 +1,7 @@
 import tempfile
 from typing import List, Tuple
 
-from presentation import Presentation
+from presentation import Presentation, Viewport
 
 
 def split_polygon(polygon: List[dict], line: Tuple[float, float, float]) -> Tuple[List[dict], List[dict]]:
@@ -61,17 +61,6 @@ def split_polygons(polygons: List[dict], line: Tuple[float, float, float]) -> Li
     return new_polygons
 
 
-def view_points(points: List[dict], limits: dict, x0: float, y0: float, width: float, height: float) -> List[dict]:
-    mapped_points = []
-
-    for point in points:
-        x = x0 + (point["x"] - limits["x_min"]) / (limits["x_max"] - limits["x_min"]) * width
-        y = y0 + (limits["y_max"] - point["y"]) / (limits["y_max"] - limits["y_min"]) * height
-        mapped_points.append({"x": x, "y": y})
-
-    return mapped_points
-
-
 def main() -> None:
     lines = [
         (-0.04116849135320658, -0.3206942150255752, 0.008537946165246545),
@@ -84,7 +73,7 @@ def main() -> None:
         (0.2645942236152999, -0.9065969173006434, -0.5403082382599146)
     ]
 
-    limits = {"x_min": -1.7, "y_min": -1.7, "x_max": 1.7, "y_max": 1.7}
+    limits = (-1.7, -1.7, 1.7, 1.7)
     polygons = [
         {"points": [{"x": -1.7, "y": -1.7}, {"x": -1.7, "y": 1.7}, {"x": 1.7, "y": 1.7}, {"x": 1.7, "y": -1.7}], "fill": "#ffffff"}
     ]
@@ -105,12 +94,8 @@ def main() -> None:
             x = x0 + (width + gap) * (i % columns)
             y = y0 + (height + gap) * (i // columns)
 
-            draw_polygons = []
-            for polygon in polygons:
-                points = view_points(points=polygon["points"], limits=limits, x0=x, y0=y, width=width, height=height)
-                draw_polygons.append({"points": points, "fill": polygon["fill"], "stroke": "#222", "thickness": 0.5})
-
-            presentation.add_polygons(draw_polygons)
+            draw_polygons = [{"points": polygon["points"], "fill": polygon["fill"], "stroke": "#222", "thickness": 0.5} for polygon in polygons]
+            presentation.add_polygons(draw_polygons, viewport=Viewport(limits=limits, rect=(x, y, width, height)))
 
         presentation.save("polygons.pptx")
 
@@ -1,9 +1,9 @@
 import math
 import random
 import tempfile
-from typing import List, Tuple
+from typing import Tuple
 
-from presentation import Presentation
+from presentation import Presentation, Viewport
 
 
 def gaussian2d(mean_x: float, mean_y: float, cov_x: float, cov_y: float, cov_xy: float) -> Tuple[float, float]:
@@ -31,42 +31,29 @@ def spiral(label: int, h: float = 1.25, delta: float = 0.1) -> Tuple[float, floa
     return r * math.sin(t), r * math.cos(t)
 
 
-def view_points(points: List[Tuple[float, float]], limits: dict, x0: float, y0: float, width: float, height: float) -> List[Tuple[float, float]]:
-    mapped_points = []
-
-    for x, y in points:
-        x = x0 + (x - limits["x_min"]) / (limits["x_max"] - limits["x_min"]) * width
-        y = y0 + (limits["y_max"] - y) / (limits["y_max"] - limits["y_min"]) * height
-        mapped_points.append((x, y))
-
-    return mapped_points
-
-
 def main() -> None:
     x0 = 2
     y0 = 2
     width = 14
     height = 14
 
-    limits1 = {"x_min": -1.7, "y_min": -1.9, "x_max": 1.6, "y_max": 1.4}
+    viewport1 = Viewport(limits=(-1.7, -1.9, 1.6, 1.4), rect=(x0, y0, width, height))
     gaussians1 = [gaussian2d(mean_x=-0.5, mean_y=-0.4, cov_x=0.1, cov_y=0.1, cov_xy=0.05) for _ in range(400)]
     gaussians2 = [gaussian2d(mean_x=0.4, mean_y=0, cov_x=0.08, cov_y=0.15, cov_xy=-0.07) for _ in range(400)]
-    gaussian_points1 = view_points(points=gaussians1, limits=limits1, x0=x0, y0=y0, width=width, height=height)
-    gaussian_points2 = view_points(points=gaussians2, limits=limits1, x0=x0, y0=y0, width=width, height=height)
 
-    limits2 = {"x_min": -1.2, "y_min": -1.2, "x_max": 1.2, "y_max": 1.2}
-    spiral1 = view_points(points=[spiral(1) for _ in range(400)], limits=limits2, x0=x0 + width + 2, y0=y0, width=width, height=height)
-    spiral2 = view_points(points=[spiral(-1) for _ in range(400)], limits=limits2, x0=x0 + width + 2, y0=y0, width=width, height=height)
+    viewport2 = Viewport(limits=(-1.2, -1.2, 1.2, 1.2), rect=(x0 + width + 2, y0, width, height))
+    spiral1 = [spiral(1) for _ in range(400)]
+    spiral2 = [spiral(-1) for _ in range(400)]
 
     with tempfile.TemporaryDirectory() as temp_path:
         presentation = Presentation(presentation_path="../empty.pptx", work_path=temp_path)
 
-        presentation.add_ellipses(ellipses=[{"x": x, "y": y, "d": 0.2, "fill": "#dd7373", "stroke": "#fff", "thickness": 0.5} for x, y in gaussian_points1])
-        presentation.add_ellipses(ellipses=[{"x": x, "y": y, "d": 0.2, "fill": "#7699d4", "stroke": "#fff", "thickness": 0.5} for x, y in gaussian_points2])
+        presentation.add_ellipses(ellipses=[{"x": x, "y": y, "d": 0.2, "fill": "#dd7373", "stroke": "#fff", "thickness": 0.5} for x, y in gaussians1], viewport=viewport1)
+        presentation.add_ellipses(ellipses=[{"x": x, "y": y, "d": 0.2, "fill": "#7699d4", "stroke": "#fff", "thickness": 0.5} for x, y in gaussians2], viewport=viewport1)
         presentation.add_rectangle({"x": x0, "y": y0, "w": width, "h": height, "stroke": "#222", "radius": 0.1})
 
-        presentation.add_ellipses(ellipses=[{"x": x, "y": y, "d": 0.2, "fill": "#dd7373", "stroke": "#fff", "thickness": 0.5} for x, y in spiral1])
-        presentation.add_ellipses(ellipses=[{"x": x, "y": y, "d": 0.2, "fill": "#7699d4", "stroke": "#fff", "thickness": 0.5} for x, y in spiral2])
+        presentation.add_ellipses(ellipses=[{"x": x, "y": y, "d": 0.2, "fill": "#dd7373", "stroke": "#fff", "thickness": 0.5} for x, y in spiral1], viewport=viewport2)
+        presentation.add_ellipses(ellipses=[{"x": x, "y": y, "d": 0.2, "fill": "#7699d4", "stroke": "#fff", "thickness": 0.5} for x, y in spiral2], viewport=viewport2)
         presentation.add_rectangle({"x": x0 + width + 2, "y": y0, "w": width, "h": height, "stroke": "#222", "radius": 0.1})
 
         presentation.save("scatter.pptx")
@@ -1,27 +1,1621 @@
+import asyncio
+import copy
+import csv
+import io
 import math
 import os
+import random
 import re
+import shutil
+import struct
+import tempfile
+import threading
+import time
 import zipfile
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+import zlib
+from array import array
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field, replace
+from functools import lru_cache, partial
+from itertools import accumulate, islice
+from typing import Awaitable, BinaryIO, Callable, ContextManager, Dict, Generator, Hashable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Type, TypeVar, Union
 
 from lxml import etree
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Values = Sequence[float]
+Boxes = Tuple[Values, Values, Values, Values]
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Style:
+    fill: Optional[str] = None
+    fill_opacity: float = 1
+    stroke: Optional[str] = None
+    stroke_opacity: float = 1
+    stroke_dash: str = "solid"
+    thickness: float = 1
+
+    @classmethod
+    def from_config(cls: Type["Style"], config: dict) -> "Style":
+        opacity = config.get("opacity", 1)
+        fill_opacity, stroke_opacity = config.get("fill-opacity", opacity), config.get("stroke-opacity", opacity)
+        return cls.intern(config.get("fill"), fill_opacity, config.get("stroke") or None, stroke_opacity, config.get("stroke-dash", "solid"), config.get("thickness", 1))
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def intern(fill: Optional[str], fill_opacity: float, stroke: Optional[str], stroke_opacity: float, stroke_dash: str, thickness: float) -> "Style":
+        return Style(fill=fill, fill_opacity=fill_opacity, stroke=stroke, stroke_opacity=stroke_opacity, stroke_dash=stroke_dash, thickness=thickness)
+
+
+@dataclass(slots=True)
+class Line:
+    kind = "line"
+
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    style: Style = Style()
+
+    def __post_init__(self) -> None:
+        self.x1, self.y1, self.x2, self.y2 = float(self.x1), float(self.y1), float(self.x2), float(self.y2)
+
+    @classmethod
+    def from_dict(cls: Type["Line"], config: dict) -> "Line":
+        return cls(config["x1"], config["y1"], config["x2"], config["y2"], style=Style.from_config(config))
+
+
+@dataclass(slots=True)
+class Ellipse:
+    kind = "ellipse"
+
+    x: float
+    y: float
+    dx: float
+    dy: float
+    rotate: float = 0
+    style: Style = Style()
+
+    def __post_init__(self) -> None:
+        self.x, self.y, self.dx, self.dy, self.rotate = float(self.x), float(self.y), float(self.dx), float(self.dy), float(self.rotate)
+
+        if self.dx < 0 or self.dy < 0:
+            raise ValueError(f"Ellipse diameters must be non-negative, got {self.dx} and {self.dy}")
+
+    @classmethod
+    def from_dict(cls: Type["Ellipse"], config: dict) -> "Ellipse":
+        dx, dy = config["dx"] if "dx" in config else config["d"], config["dy"] if "dy" in config else config["d"]
+        return cls(config["x"], config["y"], dx, dy, rotate=config.get("rotate", 0), style=Style.from_config(config))
+
+
+@dataclass(slots=True)
+class Rectangle:
+    kind = "rectangle"
+
+    x: float
+    y: float
+    w: float
+    h: float
+    rotate: float = 0
+    radius: float = 0
+    style: Style = Style()
+
+    def __post_init__(self) -> None:
+        self.x, self.y, self.w, self.h = float(self.x), float(self.y), float(self.w), float(self.h)
+        self.rotate, self.radius = float(self.rotate), float(self.radius)
+
+        if self.w < 0 or self.h < 0:
+            raise ValueError(f"Rectangle sizes must be non-negative, got {self.w} and {self.h}")
+
+    @classmethod
+    def from_dict(cls: Type["Rectangle"], config: dict) -> "Rectangle":
+        return cls(config["x"], config["y"], config["w"], config["h"], rotate=config.get("rotate", 0), radius=config.get("radius", 0), style=Style.from_config(config))
+
+
+@dataclass(slots=True)
+class Polygon:
+    kind = "polygon"
+
+    x: Values
+    y: Values
+    rotate: float = 0
+    style: Style = Style()
+
+    def __post_init__(self) -> None:
+        self.x, self.y, self.rotate = self.get_points(self.x), self.get_points(self.y), float(self.rotate)
+
+        if len(self.x) != len(self.y) or len(self.x) == 0:
+            raise ValueError(f"Polygon must have the same non-zero number of x and y coordinates, got {len(self.x)} and {len(self.y)}")
+
+    @classmethod
+    def from_dict(cls: Type["Polygon"], config: dict) -> "Polygon":
+        points = config["points"]
+        return cls([point["x"] for point in points], [point["y"] for point in points], rotate=config.get("rotate", 0), style=Style.from_config(config))
+
+    @staticmethod
+    def get_points(values: Values) -> Values:
+        if np is not None and isinstance(values, np.ndarray):
+            return np.asarray(values, dtype=float)
+
+        return values if isinstance(values, array) else array("d", values)
+
+
+@dataclass(slots=True)
+class Polyline:
+    kind = "polyline"
+
+    x: Values
+    y: Values
+    rotate: float = 0
+    style: Style = Style()
+
+    def __post_init__(self) -> None:
+        self.x, self.y, self.rotate = Polygon.get_points(self.x), Polygon.get_points(self.y), float(self.rotate)
+
+        if len(self.x) != len(self.y) or len(self.x) == 0:
+            raise ValueError(f"Polyline must have the same non-zero number of x and y coordinates, got {len(self.x)} and {len(self.y)}")
+
+    @classmethod
+    def from_dict(cls: Type["Polyline"], config: dict) -> "Polyline":
+        return cls(*cls.get_xy(config), rotate=config.get("rotate", 0), style=Style.from_config(config))
+
+    @staticmethod
+    def get_xy(config: dict) -> Tuple[Values, Values]:
+        if "x" in config:
+            return config["x"], config["y"]
+
+        points = config["points"]
+
+        if np is not None and isinstance(points, np.ndarray):
+            return (points[:, 0], points[:, 1]) if points.ndim == 2 else (points[0::2], points[1::2])
+
+        if isinstance(points[0], (int, float)):
+            return points[0::2], points[1::2]
+
+        return [point[0] for point in points], [point[1] for point in points]
+
+
+@dataclass(slots=True)
+class TextBox:
+    kind = "textbox"
+    alignments = frozenset({"center", "left", "right", "top", "bottom"})
+
+    x: float
+    y: float
+    w: float
+    h: float
+    text: str
+    size: float
+    align: str
+    rotate: float = 0
+    vertical_align: str = "center"
+    margin: Tuple[float, float, float, float] = (0, 0, 0, 0)
+    bold: bool = False
+    italic: bool = False
+    underline: bool = False
+    strike: bool = False
+    color: Optional[str] = None
+    auto_fit: bool = False
+    style: Style = Style()
+
+    def __post_init__(self) -> None:
+        self.x, self.y, self.w, self.h = float(self.x), float(self.y), float(self.w), float(self.h)
+        self.size, self.rotate, self.text = float(self.size), float(self.rotate), str(self.text)
+
+        if self.w < 0 or self.h < 0:
+            raise ValueError(f"TextBox sizes must be non-negative, got {self.w} and {self.h}")
+
+        for alignment in (self.align, self.vertical_align):
+            if alignment not in self.alignments:
+                raise ValueError(f'Unknown alignment "{alignment}"')
+
+    @classmethod
+    def from_dict(cls: Type["TextBox"], config: dict) -> "TextBox":
+        margin = (0, 0, 0, 0)
+
+        if "margin" in config:
+            margin = config["margin"]
+            margin = (margin.get("left", 0.25), margin.get("right", 0.25), margin.get("top", 0.1), margin.get("bottom", 0.1))
+
+        return cls(
+            config["x"], config["y"], config["w"], config["h"], config["text"], config["size"], config["align"],
+            rotate=config.get("rotate", 0),
+            vertical_align=config.get("vertical-align", "center"),
+            margin=margin,
+            bold=config.get("bold", False),
+            italic=config.get("italic", False),
+            underline=config.get("underline", False),
+            strike=config.get("strike", False),
+            color=config.get("color"),
+            auto_fit=config.get("auto-fit", False),
+            style=Style.from_config(config)
+        )
+
+
+Shape = Union[Line, Ellipse, Rectangle, Polygon, Polyline, TextBox]
+ShapeSpec = Tuple[str, Style, Dict[str, str], str, str, str, str, Optional[str]]
+
+
+class LRUCache:
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+
+    def get(self, key: Hashable, factory: Callable[[], T]) -> T:
+        if key in self.items:
+            self.items.move_to_end(key)
+            return self.items[key]
+
+        value = self.items[key] = factory()
+
+        if len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+        return value
+
+
+@dataclass
+class Stats:
+    seconds: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    calls: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    shapes: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    slides: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    removed: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    bytes_written: int = 0
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.seconds[phase] += seconds
+        self.calls[phase] += 1
+
+    def count(self, node: etree.Element, slide: str) -> None:
+        self.shapes[node[0][0].get("name", "").rsplit(" ", 1)[0].lower()] += 1
+        self.slides[slide] += 1
+
+    def reset(self) -> None:
+        for values in (self.seconds, self.calls, self.shapes, self.slides, self.removed):
+            values.clear()
+
+        self.bytes_written = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "seconds": dict(self.seconds),
+            "calls": dict(self.calls),
+            "shapes": dict(self.shapes),
+            "slides": dict(self.slides),
+            "removed": dict(self.removed),
+            "bytes_written": self.bytes_written
+        }
+
+
+class Columns:
+    def __init__(self, columns: dict, vectorized: bool = True) -> None:
+        self.columns = columns
+        self.vectorized = vectorized and np is not None
+
+        sizes = {len(value) for value in columns.values() if not self.is_scalar(value)}
+        if len(sizes) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(sizes)}")
+
+        self.size = sizes.pop() if sizes else 1
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.columns
+
+    def numbers(self, key: str, default: Optional[float] = None) -> Values:
+        value = self.columns.get(key, default)
+
+        if value is None:
+            raise KeyError(key)
+
+        if self.vectorized:
+            return np.broadcast_to(np.asarray(value, dtype=float), (self.size,))
+
+        return [value] * self.size if self.is_scalar(value) else list(value)
+
+    def values(self, key: str, default: object = None) -> List[object]:
+        value = self.columns.get(key, default)
+
+        if self.is_scalar(value):
+            return [value] * self.size
+
+        return value.tolist() if np is not None and isinstance(value, np.ndarray) else list(value)
+
+    @staticmethod
+    def is_scalar(value: object) -> bool:
+        return value is None or isinstance(value, (str, int, float)) or np is not None and np.ndim(value) == 0
+
+
+class TableReader:
+    formats = frozenset({"csv", "npy", "parquet"})
+
+    def __init__(self, path: str, chunk_size: int = 65536, delimiter: str = ",") -> None:
+        self.path = path
+        self.chunk_size = chunk_size
+        self.delimiter = delimiter
+        self.format = os.path.splitext(path)[1].lower().lstrip(".")
+
+        if self.format not in self.formats:
+            raise ValueError(f'Unsupported file format "{self.format}"')
+
+        if self.format == "npy" and np is None:
+            raise ImportError("Reading .npy files requires numpy")
+
+        self.names = self.__get_names()
+
+    def chunks(self, columns: Dict[str, Union[str, int]], numeric: Iterable[str]) -> Iterator[Dict[str, Values]]:
+        indices = {key: self.__get_index(column) for key, column in columns.items()}
+        numeric = set(numeric)
+
+        if self.format == "csv":
+            return self.__read_csv(indices, numeric)
+
+        if self.format == "npy":
+            return self.__read_npy(indices, numeric)
+
+        return self.__read_parquet(indices, numeric)
+
+    def __get_names(self) -> List[str]:
+        if self.format == "csv":
+            with open(self.path, "r", newline="", encoding="utf-8") as f:
+                return next(csv.reader(f, delimiter=self.delimiter), [])
+
+        if self.format == "npy":
+            data = np.load(self.path, mmap_mode="r")
+
+            if data.dtype.names is not None:
+                return list(data.dtype.names)
+
+            if data.ndim != 2:
+                raise ValueError(f"Expected a structured or 2-D array, got shape {data.shape}")
+
+            return [str(i) for i in range(data.shape[1])]
+
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(self.path).schema_arrow.names
+
+    def __get_index(self, column: Union[str, int]) -> int:
+        if isinstance(column, int) and 0 <= column < len(self.names):
+            return column
+
+        if column not in self.names:
+            raise ValueError(f'Unknown column "{column}"')
+
+        return self.names.index(column)
+
+    def __read_csv(self, indices: Dict[str, int], numeric: Set[str]) -> Generator[Dict[str, Values], None, None]:
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f, delimiter=self.delimiter)
+            next(reader, None)
+
+            while rows := list(islice(reader, self.chunk_size)):
+                chunk = {}
+
+                for key, index in indices.items():
+                    values = [row[index] for row in rows]
+                    chunk[key] = self.__get_numbers(values) if key in numeric else values
+
+                yield chunk
+
+    def __read_npy(self, indices: Dict[str, int], numeric: Set[str]) -> Generator[Dict[str, Values], None, None]:
+        data = np.load(self.path, mmap_mode="r")
+
+        for start in range(0, len(data), self.chunk_size):
+            rows = data[start:start + self.chunk_size]
+            chunk = {}
+
+            for key, index in indices.items():
+                values = rows[self.names[index]] if data.dtype.names is not None else rows[:, index]
+                chunk[key] = np.asarray(values, dtype=float) if key in numeric else values.tolist()
+
+            yield chunk
+
+    def __read_parquet(self, indices: Dict[str, int], numeric: Set[str]) -> Generator[Dict[str, Values], None, None]:
+        import pyarrow.parquet as pq
+        names = sorted({self.names[index] for index in indices.values()})
+
+        for batch in pq.ParquetFile(self.path).iter_batches(batch_size=self.chunk_size, columns=names):
+            chunk = {}
+
+            for key, index in indices.items():
+                values = batch.column(names.index(self.names[index]))
+                chunk[key] = self.__get_numbers(values.to_numpy(zero_copy_only=False)) if key in numeric else values.to_pylist()
+
+            yield chunk
+
+    @staticmethod
+    def __get_numbers(values: Sequence[object]) -> Values:
+        if np is not None:
+            return np.asarray(values, dtype=float)
+
+        return array("d", map(float, values))
+
+
+class Viewport:
+    def __init__(
+        self,
+        limits: Tuple[float, float, float, float],
+        rect: Tuple[float, float, float, float],
+        log_x: bool = False,
+        log_y: bool = False,
+        flip_x: bool = False,
+        flip_y: bool = False
+    ) -> None:
+        x_min, y_min, x_max, y_max = limits
+
+        if x_min == x_max or y_min == y_max:
+            raise ValueError(f"Viewport limits must have non-zero width and height, got {limits}")
+
+        if log_x and min(x_min, x_max) <= 0 or log_y and min(y_min, y_max) <= 0:
+            raise ValueError(f"Viewport limits of logarithmic axes must be positive, got {limits}")
+
+        self.limits = limits
+        self.rect = rect
+        self.log_x = log_x
+        self.log_y = log_y
+        self.flip_x = flip_x
+        self.flip_y = flip_y
+
+    def points(self, x: Union[float, Values], y: Union[float, Values]) -> Tuple[Union[float, Values], Union[float, Values]]:
+        x_min, y_min, x_max, y_max = self.limits
+        left, top, width, height = self.rect
+        return self.__map(x, x_min, x_max, left, width, log=self.log_x, reverse=self.flip_x), self.__map(y, y_min, y_max, top, height, log=self.log_y, reverse=not self.flip_y)
+
+    def ellipses(self, x: Values, y: Values, dx: Values, dy: Values) -> Tuple[Values, Values]:
+        x, y = self.points(x, y)
+
+        if np is not None and isinstance(x, np.ndarray):
+            return x - np.asarray(dx) / 2, y - np.asarray(dy) / 2
+
+        return [cx - d / 2 for cx, d in zip(x, dx)], [cy - d / 2 for cy, d in zip(y, dy)]
+
+    def rectangles(self, x: Values, y: Values, w: Values, h: Values) -> Tuple[Values, Values, Values, Values]:
+        if np is not None and isinstance(x, np.ndarray):
+            (x0, y0), (x1, y1) = self.points(x, y), self.points(x + np.asarray(w), y + np.asarray(h))
+            return np.minimum(x0, x1), np.minimum(y0, y1), np.abs(x1 - x0), np.abs(y1 - y0)
+
+        (x0, y0), (x1, y1) = self.points(x, y), self.points([a + b for a, b in zip(x, w)], [a + b for a, b in zip(y, h)])
+        return list(map(min, x0, x1)), list(map(min, y0, y1)), [abs(b - a) for a, b in zip(x0, x1)], [abs(b - a) for a, b in zip(y0, y1)]
+
+    def __map(self, values: Union[float, Values], low: float, high: float, offset: float, size: float, log: bool, reverse: bool) -> Union[float, Values]:
+        if log:
+            low, high = math.log10(low), math.log10(high)
+
+        span = high - low
+
+        if np is not None and isinstance(values, np.ndarray):
+            values = np.log10(values) if log else np.asarray(values, dtype=float)
+            return offset + (high - values) / span * size if reverse else offset + (values - low) / span * size
+
+        if isinstance(values, (int, float)):
+            value = math.log10(values) if log else values
+            return offset + (high - value) / span * size if reverse else offset + (value - low) / span * size
+
+        values = [math.log10(value) for value in values] if log else values
+        return [offset + (high - value) / span * size for value in values] if reverse else [offset + (value - low) / span * size for value in values]
+
+
+class BBoxEngine:
+    def __init__(self, vectorized: bool = True, min_size: int = 64) -> None:
+        self.vectorized = vectorized and np is not None
+        self.min_size = min_size
+
+    def lines(self, x1: Values, y1: Values, x2: Values, y2: Values) -> Boxes:
+        if self.__is_vectorized(x1):
+            x1, y1, x2, y2 = (np.asarray(values, dtype=float) for values in (x1, y1, x2, y2))
+            return np.minimum(x1, x2), np.minimum(y1, y2), np.maximum(x1, x2), np.maximum(y1, y2)
+
+        return list(map(min, x1, x2)), list(map(min, y1, y2)), list(map(max, x1, x2)), list(map(max, y1, y2))
+
+    def ellipses(self, x: Values, y: Values, dx: Values, dy: Values, rotate: Values) -> Boxes:
+        if self.__is_vectorized(x):
+            x, y, dx, dy, rotate = (np.asarray(values, dtype=float) for values in (x, y, dx, dy, rotate))
+            angle = np.radians(rotate)
+            cos, sin = np.cos(angle), np.sin(angle)
+            return self.__get_rotated_boxes(x, y, dx, dy, np.hypot(dx * cos, dy * sin), np.hypot(dx * sin, dy * cos), rotate)
+
+        boxes = []
+        for ellipse_x, ellipse_y, ellipse_dx, ellipse_dy, ellipse_rotate in zip(x, y, dx, dy, rotate):
+            angle = math.radians(ellipse_rotate)
+            w, h = math.hypot(ellipse_dx * math.cos(angle), ellipse_dy * math.sin(angle)), math.hypot(ellipse_dx * math.sin(angle), ellipse_dy * math.cos(angle))
+            boxes.append(self.__get_rotated_box(ellipse_x, ellipse_y, ellipse_dx, ellipse_dy, w, h, ellipse_rotate))
+
+        return self.__transpose(boxes)
+
+    def rectangles(self, x: Values, y: Values, w: Values, h: Values, rotate: Values) -> Boxes:
+        if self.__is_vectorized(x):
+            x, y, w, h, rotate = (np.asarray(values, dtype=float) for values in (x, y, w, h, rotate))
+            angle = np.radians(rotate)
+            cos, sin = np.abs(np.cos(angle)), np.abs(np.sin(angle))
+            return self.__get_rotated_boxes(x, y, w, h, w * cos + h * sin, w * sin + h * cos, rotate)
+
+        boxes = []
+        for rectangle_x, rectangle_y, rectangle_w, rectangle_h, rectangle_rotate in zip(x, y, w, h, rotate):
+            angle = math.radians(rectangle_rotate)
+            cos, sin = abs(math.cos(angle)), abs(math.sin(angle))
+            rotated_w, rotated_h = rectangle_w * cos + rectangle_h * sin, rectangle_w * sin + rectangle_h * cos
+            boxes.append(self.__get_rotated_box(rectangle_x, rectangle_y, rectangle_w, rectangle_h, rotated_w, rotated_h, rectangle_rotate))
+
+        return self.__transpose(boxes)
+
+    def polygons(self, x: Values, y: Values, sizes: Sequence[int], rotate: Values) -> Boxes:
+        if self.__is_vectorized(x):
+            x, y, sizes, rotate = np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(sizes, dtype=np.int64), np.asarray(rotate, dtype=float)
+            starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+            index = np.repeat(np.arange(len(sizes)), sizes)
+
+            cx, cy = (np.add.reduceat(x, starts) / sizes)[index], (np.add.reduceat(y, starts) / sizes)[index]
+            angle = np.radians(rotate)[index]
+            cos, sin = np.cos(angle), np.sin(angle)
+            unrotated = (rotate == 0)[index]
+            px = np.where(unrotated, x, cx + (x - cx) * cos - (y - cy) * sin)
+            py = np.where(unrotated, y, cy + (x - cx) * sin + (y - cy) * cos)
+            return np.minimum.reduceat(px, starts), np.minimum.reduceat(py, starts), np.maximum.reduceat(px, starts), np.maximum.reduceat(py, starts)
+
+        boxes = []
+        start = 0
+        for size, polygon_rotate in zip(sizes, rotate):
+            xs, ys = x[start:start + size], y[start:start + size]
+            start += size
+
+            if polygon_rotate != 0:
+                angle = math.radians(polygon_rotate)
+                cos, sin, cx, cy = math.cos(angle), math.sin(angle), sum(xs) / size, sum(ys) / size
+                xs, ys = [cx + (px - cx) * cos - (py - cy) * sin for px, py in zip(xs, ys)], [cy + (px - cx) * sin + (py - cy) * cos for px, py in zip(xs, ys)]
+
+            boxes.append((min(xs), min(ys), max(xs), max(ys)))
+
+        return self.__transpose(boxes)
+
+    def union(self, *boxes: Boxes) -> Tuple[float, float, float, float]:
+        if self.__is_vectorized(range(sum(len(box[0]) for box in boxes))):
+            x1, y1, x2, y2 = (np.concatenate([np.asarray(box[i], dtype=float) for box in boxes]) for i in range(4))
+            x_min, y_min, x_max, y_max = float(np.min(x1)), float(np.min(y1)), float(np.max(x2)), float(np.max(y2))
+        else:
+            x_min, y_min = min(min(box[0]) for box in boxes), min(min(box[1]) for box in boxes)
+            x_max, y_max = max(max(box[2]) for box in boxes), max(max(box[3]) for box in boxes)
+
+        return x_min, y_min, x_max - x_min, y_max - y_min
+
+    def rows(self, boxes: Boxes) -> List[Tuple[float, float, float, float]]:
+        return list(zip(*(values if isinstance(values, list) else values.tolist() for values in boxes)))
+
+    def __is_vectorized(self, values: Values) -> bool:
+        return self.vectorized and len(values) >= self.min_size
+
+    def __get_rotated_boxes(self, x: Values, y: Values, w: Values, h: Values, rotated_w: Values, rotated_h: Values, rotate: Values) -> Boxes:
+        unrotated = rotate == 0
+        cx, cy = x + w / 2, y + h / 2
+        x1, y1 = np.where(unrotated, x, cx - rotated_w / 2), np.where(unrotated, y, cy - rotated_h / 2)
+        x2, y2 = np.where(unrotated, x + w, cx + rotated_w / 2), np.where(unrotated, y + h, cy + rotated_h / 2)
+        return x1, y1, x2, y2
+
+    def __get_rotated_box(self, x: float, y: float, w: float, h: float, rotated_w: float, rotated_h: float, rotate: float) -> Tuple[float, float, float, float]:
+        if rotate == 0:
+            return x, y, x + w, y + h
+
+        cx, cy = x + w / 2, y + h / 2
+        return cx - rotated_w / 2, cy - rotated_h / 2, cx + rotated_w / 2, cy + rotated_h / 2
+
+    def __transpose(self, boxes: List[Tuple[float, float, float, float]]) -> Boxes:
+        x1, y1, x2, y2 = zip(*boxes)
+        return list(x1), list(y1), list(x2), list(y2)
+
+
+class Decimator:
+    def __init__(self, width: float, height: float, resolution: float) -> None:
+        self.resolution = resolution
+        self.columns = max(1, math.ceil(width / resolution))
+        self.rows = max(1, math.ceil(height / resolution))
+        self.covered = bytearray(self.columns * self.rows)
+
+    def ellipses(self, covers: List[Tuple[float, float, float, float]], extents: List[Tuple[float, float, float, float]], opaque: List[bool]) -> List[bool]:
+        visible = [True] * len(covers)
+
+        for i in reversed(range(len(covers))):
+            if self.__is_covered(*extents[i]):
+                visible[i] = False
+            elif opaque[i]:
+                self.__cover(*covers[i])
+
+        return visible
+
+    @staticmethod
+    def polyline(x: Values, y: Values, tolerance: float) -> List[int]:
+        keep = [False] * len(x)
+        keep[0] = keep[-1] = True
+        stack = [(0, len(x) - 1)]
+
+        while stack:
+            start, end = stack.pop()
+            distances = ((Decimator.__get_distance(x[i], y[i], x[start], y[start], x[end], y[end]), i) for i in range(start + 1, end))
+            distance, index = max(distances, default=(0, start))
+
+            if distance > tolerance:
+                keep[index] = True
+                stack.extend([(start, index), (index, end)])
+
+        return [i for i, kept in enumerate(keep) if kept]
+
+    def __is_covered(self, cx: float, cy: float, rx: float, ry: float) -> bool:
+        column, row = math.floor(cx / self.resolution), math.floor(cy / self.resolution)
+        if not 0 <= column < self.columns or not 0 <= row < self.rows or not self.covered[row * self.columns + column]:
+            return False
+
+        for row, column0, column1 in self.__get_spans(cx, cy, rx, ry):
+            if column0 < 0 or column1 > self.columns or self.covered.find(0, row * self.columns + column0, row * self.columns + column1) != -1:
+                return False
+
+        return True
+
+    def __cover(self, cx: float, cy: float, rx: float, ry: float) -> None:
+        for row, column0, column1 in self.__get_spans(cx, cy, rx, ry):
+            column0, column1 = max(0, column0), min(self.columns, column1)
+
+            if column0 < column1:
+                self.covered[row * self.columns + column0:row * self.columns + column1] = b"\x01" * (column1 - column0)
+
+    def __get_spans(self, cx: float, cy: float, rx: float, ry: float) -> Generator[Tuple[int, int, int], None, None]:
+        if rx <= 0 or ry <= 0:
+            return
+
+        for row in range(max(0, math.ceil((cy - ry) / self.resolution - 0.5)), min(self.rows - 1, math.floor((cy + ry) / self.resolution - 0.5)) + 1):
+            dy = (row + 0.5) * self.resolution - cy
+            half_width = rx * math.sqrt(max(0, 1 - (dy / ry) ** 2))
+            yield row, math.ceil((cx - half_width) / self.resolution - 0.5), math.floor((cx + half_width) / self.resolution - 0.5) + 1
+
+    @staticmethod
+    def __get_distance(x: float, y: float, x1: float, y1: float, x2: float, y2: float) -> float:
+        dx, dy = x2 - x1, y2 - y1
+        length = dx * dx + dy * dy
+
+        if length == 0:
+            return math.hypot(x - x1, y - y1)
+
+        t = min(1, max(0, ((x - x1) * dx + (y - y1) * dy) / length))
+        return math.hypot(x - x1 - t * dx, y - y1 - t * dy)
+
+
+class SpatialIndex:
+    def __init__(self, cell_size: float = 1.0) -> None:
+        self.cell_size = cell_size
+        self.boxes: Dict[int, Tuple[float, float, float, float]] = {}
+        self.cells: Dict[Tuple[int, int], set] = defaultdict(set)
+        self.extent: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def __contains__(self, shape_id: int) -> bool:
+        return shape_id in self.boxes
+
+    def insert(self, shape_id: int, box: Tuple[float, float, float, float]) -> None:
+        if shape_id in self.boxes:
+            self.remove(shape_id)
+
+        self.boxes[shape_id] = box
+        column0, row0, column1, row1 = self.__get_cells(box)
+
+        for column in range(column0, column1 + 1):
+            for row in range(row0, row1 + 1):
+                self.cells[column, row].add(shape_id)
+
+        if self.extent is None:
+            self.extent = [column0, row0, column1, row1]
+        else:
+            self.extent = [min(self.extent[0], column0), min(self.extent[1], row0), max(self.extent[2], column1), max(self.extent[3], row1)]
+
+    def remove(self, shape_id: int) -> None:
+        column0, row0, column1, row1 = self.__get_cells(self.boxes.pop(shape_id))
+
+        for column in range(column0, column1 + 1):
+            for row in range(row0, row1 + 1):
+                self.cells[column, row].discard(shape_id)
+
+                if not self.cells[column, row]:
+                    del self.cells[column, row]
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> List[int]:
+        shape_ids = []
+
+        for shape_id in set(self.__get_candidates((x0, y0, x1, y1))):
+            box_x0, box_y0, box_x1, box_y1 = self.boxes[shape_id]
+
+            if box_x0 <= x1 and x0 <= box_x1 and box_y0 <= y1 and y0 <= box_y1:
+                shape_ids.append(shape_id)
+
+        return sorted(shape_ids)
+
+    def overlap(self, x0: float, y0: float, x1: float, y1: float, exclude: Iterable[int] = (), limit: float = math.inf) -> float:
+        seen = set(exclude)
+        area = 0.0
+
+        for shape_id in self.__get_candidates((x0, y0, x1, y1)):
+            box_x0, box_y0, box_x1, box_y1 = self.boxes[shape_id]
+            if box_x0 >= x1 or x0 >= box_x1 or box_y0 >= y1 or y0 >= box_y1 or shape_id in seen:
+                continue
+
+            seen.add(shape_id)
+            area += (min(x1, box_x1) - max(x0, box_x0)) * (min(y1, box_y1) - max(y0, box_y0))
+
+            if area >= limit:
+                return area
+
+        return area
+
+    def nearest(self, x: float, y: float) -> Optional[int]:
+        if not self.boxes:
+            return None
+
+        column, row = math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+        radius = max(abs(column - self.extent[0]), abs(column - self.extent[2]), abs(row - self.extent[1]), abs(row - self.extent[3]))
+        best = (math.inf, 0)
+
+        for ring in range(radius + 1):
+            for cell in self.__get_ring(column, row, ring):
+                for shape_id in self.cells.get(cell, ()):
+                    best = min(best, (self.__get_distance(self.boxes[shape_id], x, y), shape_id))
+
+            if best[0] <= ring * self.cell_size:
+                break
+
+        return best[1]
+
+    def overlaps(self) -> List[Tuple[int, int]]:
+        pairs = set()
+
+        for shape_ids in self.cells.values():
+            shape_ids = sorted(shape_ids)
+
+            for i, shape_id in enumerate(shape_ids):
+                for other_id in shape_ids[i + 1:]:
+                    if (shape_id, other_id) not in pairs and self.__is_intersected(self.boxes[shape_id], self.boxes[other_id]):
+                        pairs.add((shape_id, other_id))
+
+        return sorted(pairs)
+
+    def __get_candidates(self, box: Tuple[float, float, float, float]) -> Generator[int, None, None]:
+        if self.extent is None:
+            return
+
+        column0, row0, column1, row1 = self.__get_cells(box)
+        column0, row0, column1, row1 = max(column0, self.extent[0]), max(row0, self.extent[1]), min(column1, self.extent[2]), min(row1, self.extent[3])
+
+        if column0 > column1 or row0 > row1:
+            return
+
+        if (column1 - column0 + 1) * (row1 - row0 + 1) > len(self.boxes):
+            yield from self.boxes
+            return
+
+        for column in range(column0, column1 + 1):
+            for row in range(row0, row1 + 1):
+                yield from self.cells.get((column, row), ())
+
+    def __get_cells(self, box: Tuple[float, float, float, float]) -> Tuple[int, int, int, int]:
+        x0, y0, x1, y1 = box
+        return math.floor(x0 / self.cell_size), math.floor(y0 / self.cell_size), math.floor(x1 / self.cell_size), math.floor(y1 / self.cell_size)
+
+    def __get_ring(self, column: int, row: int, ring: int) -> Generator[Tuple[int, int], None, None]:
+        if ring == 0:
+            yield column, row
+            return
+
+        for i in range(-ring, ring + 1):
+            yield column + i, row - ring
+            yield column + i, row + ring
+
+        for i in range(-ring + 1, ring):
+            yield column - ring, row + i
+            yield column + ring, row + i
+
+    @staticmethod
+    def __is_intersected(box: Tuple[float, float, float, float], other_box: Tuple[float, float, float, float]) -> bool:
+        return box[0] < other_box[2] and other_box[0] < box[2] and box[1] < other_box[3] and other_box[1] < box[3]
+
+    @staticmethod
+    def __get_distance(box: Tuple[float, float, float, float], x: float, y: float) -> float:
+        return math.hypot(max(box[0] - x, 0, x - box[2]), max(box[1] - y, 0, y - box[3]))
+
+
+class LabelPlacer:
+    offsets = [(0, -1), (0, 0), (-1, -1), (-1, 0), (-0.5, -1), (-0.5, 0), (0, -0.5), (-1, -0.5)]
+
+    def __init__(
+        self,
+        offsets: Optional[Sequence[Tuple[float, float]]] = None,
+        obstacles: Optional[SpatialIndex] = None,
+        seed: int = 0,
+        vectorized: bool = True,
+        min_size: int = 64,
+        time_budget: float = 0.5
+    ) -> None:
+        self.offsets = list(offsets) if offsets is not None else self.offsets
+        self.obstacles = obstacles
+        self.vectorized = vectorized and np is not None
+        self.min_size = min_size
+        self.time_budget = time_budget
+        self.random = random.Random(seed)
+        self.labels: List[Tuple[float, float, float, float]] = []
+        self.choices: List[int] = []
+        self.boxes: List[List[Tuple[float, float, float, float]]] = []
+        self.blocked: List[List[float]] = []
+        self.values: Optional[Values] = None
+        self.neighbours: Optional[Tuple[List[int], Values]] = None
+        self.waves: List[Tuple[Values, Values, Values]] = []
+
+    def place(self, labels: List[Tuple[float, float, float, float]], anneal: bool = False) -> List[bool]:
+        self.labels, self.choices = labels, []
+        self.boxes = [self.__get_boxes(*label) for label in labels]
+        self.values = self.__get_values() if self.vectorized and len(labels) >= self.min_size else None
+        self.neighbours = self.__get_neighbours() if self.values is not None else None
+        self.blocked = self.__get_all_blocked()
+
+        if self.neighbours is not None:
+            return self.__place_vectorized(anneal)
+
+        index = self.__make_index()
+
+        for i in range(len(labels)):
+            costs = self.__get_costs(index, i)
+            self.choices.append(costs.index(min(costs)))
+            index.insert(i, self.boxes[i][self.choices[-1]])
+
+        if anneal:
+            self.__anneal(index)
+
+        return [self.__get_cost(index, i, choice) > 0 for i, choice in enumerate(self.choices)]
+
+    def visible(self) -> List[bool]:
+        if self.neighbours is not None:
+            return self.__get_vectorized_visible()
+
+        index = self.__make_index()
+        visible = []
+
+        for i, choice in enumerate(self.choices):
+            visible.append(self.__get_cost(index, i, choice) == 0)
+
+            if visible[-1]:
+                index.insert(i, self.boxes[i][choice])
+
+        return visible
+
+    def position(self, i: int) -> Tuple[float, float]:
+        x0, y0, _, _ = self.boxes[i][self.choices[i]]
+        return x0, y0
+
+    def __anneal(self, index: SpatialIndex) -> None:
+        conflicts = [i for i, choice in enumerate(self.choices) if self.__get_cost(index, i, choice) > 0]
+        if not conflicts or len(self.offsets) < 2:
+            return
+
+        steps, temperature, cooling = self.__get_schedule(conflicts)
+        deadline = time.perf_counter() + self.time_budget
+
+        for step in range(steps):
+            if step % 256 == 0 and time.perf_counter() > deadline:
+                break
+
+            i = self.random.choice(conflicts)
+            choice = self.random.randrange(len(self.offsets) - 1)
+            choice += choice >= self.choices[i]
+
+            threshold = self.__get_cost(index, i, self.choices[i]) - temperature * math.log(1 - self.random.random())
+
+            if self.__get_cost(index, i, choice, limit=threshold) < threshold:
+                self.choices[i] = choice
+                index.insert(i, self.boxes[i][choice])
+
+            temperature *= cooling
+
+    def __get_schedule(self, conflicts: List[int]) -> Tuple[int, float, float]:
+        steps = min(20 * len(conflicts), 20000)
+        temperature = sum(w * h for _, _, w, h in self.labels) / len(self.labels)
+        return steps, temperature, 1e-3 ** (1 / steps)
+
+    def __make_index(self) -> SpatialIndex:
+        return SpatialIndex(cell_size=max((max(w, h) for _, _, w, h in self.labels), default=1.0) or 1.0)
+
+    def __get_costs(self, index: SpatialIndex, i: int) -> List[float]:
+        costs = [self.__get_cost(index, i, 0)]
+        if costs[0] == 0:
+            return costs
+
+        neighbours = [index.boxes[j] for j in index.query(*self.__get_union(i)) if j != i]
+
+        for choice, box in enumerate(self.boxes[i][1:], start=1):
+            costs.append(self.__get_area(box, neighbours, cost=self.blocked[i][choice] if self.blocked else 0.0, limit=min(costs)))
+
+            if costs[-1] == 0:
+                break
+
+        return costs
+
+    def __get_cost(self, index: SpatialIndex, i: int, choice: int, limit: float = math.inf) -> float:
+        cost = self.blocked[i][choice] if self.blocked else 0.0
+
+        if cost < limit:
+            cost += index.overlap(*self.boxes[i][choice], exclude=(i,), limit=limit - cost)
+
+        return cost
+
+    def __place_vectorized(self, anneal: bool) -> List[bool]:
+        boxes = self.values
+        blocked = np.asarray(self.blocked, dtype=float) if self.blocked else np.zeros(boxes.shape[:2])
+        placed, choices = np.empty((len(boxes), 4)), np.zeros(len(boxes), dtype=np.int64)
+        self.waves = self.__get_waves()
+
+        for labels, owners, others in self.waves:
+            costs = blocked[labels]
+            np.add.at(costs, owners, self.__get_pair_areas(boxes[labels[owners]], placed[others][:, None, :]))
+            choices[labels] = costs.argmin(axis=1)
+            placed[labels] = boxes[labels, choices[labels]]
+
+        self.choices = choices.tolist()
+        overlapped = self.__get_overlapped(placed)
+
+        if anneal and overlapped.any() and len(self.offsets) > 1:
+            placed_boxes = [boxes[choice] for boxes, choice in zip(self.boxes, self.choices)]
+            conflicts = np.flatnonzero(overlapped).tolist()
+            steps, temperature, cooling = self.__get_schedule(conflicts)
+            deadline = time.perf_counter() + self.time_budget
+
+            for step in range(steps):
+                if step % 256 == 0 and time.perf_counter() > deadline:
+                    break
+
+                i = self.random.choice(conflicts)
+                choice = self.random.randrange(len(self.offsets) - 1)
+                choice += choice >= self.choices[i]
+
+                current, proposed = self.__get_neighbour_costs(i, [self.choices[i], choice], boxes=boxes, placed=placed, placed_boxes=placed_boxes)
+
+                if proposed < current - temperature * math.log(1 - self.random.random()):
+                    self.choices[i] = choice
+                    placed[i], placed_boxes[i] = boxes[i, choice], self.boxes[i][choice]
+
+                temperature *= cooling
+
+            overlapped = self.__get_overlapped(placed)
+
+        return overlapped.tolist()
+
+    def __get_neighbour_costs(self, i: int, choices: List[int], boxes: Values, placed: Values, placed_boxes: list) -> List[float]:
+        starts, neighbours = self.neighbours
+        ids = neighbours[starts[i]:starts[i + 1]]
+        costs = [self.blocked[i][choice] for choice in choices] if self.blocked else [0.0] * len(choices)
+
+        if len(ids) > 16:
+            return (np.asarray(costs) + self.__get_areas(boxes[i, choices], placed[ids])).tolist()
+
+        others = [placed_boxes[j] for j in ids.tolist()]
+        return [self.__get_area(self.boxes[i][choice], others, cost=cost) for choice, cost in zip(choices, costs)]
+
+    def __get_waves(self) -> List[Tuple[Values, Values, Values]]:
+        starts, neighbours = self.neighbours
+        owners = np.repeat(np.arange(len(self.labels)), np.diff(starts))
+        earlier = neighbours < owners
+        owners, others = owners[earlier], neighbours[earlier]
+
+        bounds, previous = np.concatenate(([0], np.cumsum(np.bincount(owners, minlength=len(self.labels))))).tolist(), others.tolist()
+        levels = [0] * len(self.labels)
+
+        for i in range(len(levels)):
+            if bounds[i] < bounds[i + 1]:
+                levels[i] = max(map(levels.__getitem__, previous[bounds[i]:bounds[i + 1]])) + 1
+
+        levels = np.asarray(levels)
+        labels = np.argsort(levels, kind="stable")
+        positions = np.empty_like(labels)
+        positions[labels] = np.arange(len(labels))
+        order = np.argsort(levels[owners], kind="stable")
+        owners, others = owners[order], others[order]
+
+        label_bounds = np.searchsorted(levels[labels], np.arange(levels.max() + 2)).tolist()
+        pair_bounds = np.searchsorted(levels[owners], np.arange(levels.max() + 2)).tolist()
+        return [
+            (labels[label_bounds[k]:label_bounds[k + 1]], positions[owners[pair_bounds[k]:pair_bounds[k + 1]]] - label_bounds[k], others[pair_bounds[k]:pair_bounds[k + 1]])
+            for k in range(len(label_bounds) - 1)
+        ]
+
+    def __get_overlapped(self, placed: Values) -> Values:
+        starts, neighbours = self.neighbours
+        owners = np.repeat(np.arange(len(placed)), np.diff(starts))
+        costs = np.asarray([self.blocked[i][choice] for i, choice in enumerate(self.choices)] if self.blocked else np.zeros(len(placed)))
+        np.add.at(costs, owners, self.__get_pair_areas(placed[owners], placed[neighbours]))
+        return costs > 0
+
+    def __get_vectorized_visible(self) -> List[bool]:
+        boxes, choices = self.values, np.asarray(self.choices)
+        chosen = boxes[np.arange(len(boxes)), choices]
+        blocked = np.asarray(self.blocked, dtype=float)[np.arange(len(boxes)), choices] if self.blocked else np.zeros(len(boxes))
+        shown, visible = np.tile(np.array([math.inf, math.inf, -math.inf, -math.inf]), (len(boxes), 1)), np.zeros(len(boxes), dtype=bool)
+
+        for labels, owners, others in self.waves:
+            costs = blocked[labels]
+            np.add.at(costs, owners, self.__get_pair_areas(chosen[labels[owners]], shown[others]))
+            visible[labels] = costs == 0
+            shown[labels[costs == 0]] = chosen[labels[costs == 0]]
+
+        return visible.tolist()
+
+    def __get_neighbours(self) -> Tuple[List[int], Values]:
+        unions = self.__get_unions()
+        owners, neighbours = self.__get_near_pairs(unions, unions)
+        distinct = owners != neighbours
+        owners, neighbours = owners[distinct], neighbours[distinct]
+        starts = np.concatenate(([0], np.cumsum(np.bincount(owners, minlength=len(unions)))))
+        return starts.tolist(), neighbours[np.argsort(owners, kind="stable")]
+
+    def __get_all_blocked(self) -> List[List[float]]:
+        if self.obstacles is None or not self.obstacles.boxes:
+            return []
+
+        if self.values is not None:
+            blocked = self.__get_vectorized_blocked()
+
+            if blocked is not None:
+                return blocked
+
+        return [self.__get_blocked(i) for i in range(len(self.labels))]
+
+    def __get_vectorized_blocked(self) -> Optional[List[List[float]]]:
+        boxes = self.values
+        obstacles, unions = np.asarray(list(self.obstacles.boxes.values()), dtype=float), self.__get_unions()
+        small = ((obstacles[:, 2:] - obstacles[:, :2]) <= (unions[:, 2:] - unions[:, :2]).max(axis=0)).all(axis=1)
+        labels, owners = self.__get_near_pairs(unions, obstacles[small])
+        if not small.all():
+            pairs = self.__get_pairs(unions, obstacles[~small])
+            if pairs is None:
+                return None
+
+            labels, owners = np.concatenate((labels, pairs[0])), np.concatenate((np.flatnonzero(small)[owners], np.flatnonzero(~small)[pairs[1]]))
+        else:
+            owners = np.flatnonzero(small)[owners]
+        anchors, pair_obstacles = np.asarray(self.labels, dtype=float)[labels, :2], obstacles[owners]
+        keep = ~((pair_obstacles[:, :2] <= anchors) & (anchors <= pair_obstacles[:, 2:])).all(axis=1)
+        labels, pair_obstacles = labels[keep], pair_obstacles[keep]
+
+        blocked = np.zeros(boxes.shape[:2])
+        np.add.at(blocked, labels, self.__get_pair_areas(boxes[labels], pair_obstacles[:, None, :]))
+        return blocked.tolist()
+
+    def __get_values(self) -> Values:
+        labels, offsets = np.asarray(self.labels, dtype=float)[:, None, :], np.asarray(self.offsets, dtype=float)
+        x, y, w, h = labels[..., 0], labels[..., 1], labels[..., 2], labels[..., 3]
+        return np.stack((x + offsets[:, 0] * w, y + offsets[:, 1] * h, x + (offsets[:, 0] + 1) * w, y + (offsets[:, 1] + 1) * h), axis=2)
+
+    def __get_unions(self) -> Values:
+        boxes = self.values
+        return np.concatenate((boxes[:, :, :2].min(axis=1), boxes[:, :, 2:].max(axis=1)), axis=1)
+
+    @staticmethod
+    def __get_pairs(boxes: Values, others: Values) -> Optional[Tuple[Sequence[int], Sequence[int]]]:
+        cell_size = float((boxes[:, 2:] - boxes[:, :2]).max()) or 1.0
+
+        first, last = np.floor(others[:, :2] / cell_size).astype(np.int64), np.floor(others[:, 2:] / cell_size).astype(np.int64)
+        spans = last - first + 1
+        counts = spans[:, 0] * spans[:, 1]
+        if counts.sum() > 16 * (len(boxes) + len(others)):
+            return None
+
+        owners = np.repeat(np.arange(len(others)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        other_cells = first[owners] + np.stack((local % spans[owners, 0], local // spans[owners, 0]), axis=1)
+
+        box_first, box_last = np.floor(boxes[:, :2] / cell_size).astype(np.int64), np.floor(boxes[:, 2:] / cell_size).astype(np.int64)
+        box_cells = np.concatenate([box_first + shift for shift in ((0, 0), (1, 0), (0, 1), (1, 1))])
+        box_ids = np.tile(np.arange(len(boxes)), 4)
+        inside = (box_cells <= np.tile(box_last, (4, 1))).all(axis=1)
+        box_cells, box_ids = box_cells[inside], box_ids[inside]
+
+        low = np.minimum(other_cells.min(axis=0), box_cells.min(axis=0))
+        height = max(other_cells[:, 1].max(), box_cells[:, 1].max()) - low[1] + 1
+        other_keys, box_keys = (other_cells - low) @ (height, 1), (box_cells - low) @ (height, 1)
+
+        order = np.argsort(other_keys, kind="stable")
+        other_keys, owners = other_keys[order], owners[order]
+        starts, ends = np.searchsorted(other_keys, box_keys, side="left"), np.searchsorted(other_keys, box_keys, side="right")
+        sizes = ends - starts
+
+        cells = np.repeat(np.arange(len(box_keys)), sizes)
+        pair_others = owners[np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes) + np.repeat(starts, sizes)]
+        pair_boxes, pair_other_boxes = box_ids[cells], others[pair_others]
+        pair_box_values = boxes[pair_boxes]
+
+        intersected = ((pair_box_values[:, :2] <= pair_other_boxes[:, 2:]) & (pair_other_boxes[:, :2] <= pair_box_values[:, 2:])).all(axis=1)
+        corners = np.floor(np.maximum(pair_box_values[:, :2], pair_other_boxes[:, :2]) / cell_size).astype(np.int64)
+        keep = intersected & ((corners - low) @ (height, 1) == box_keys[cells])
+        return pair_boxes[keep], pair_others[keep]
+
+    @staticmethod
+    def __get_near_pairs(boxes: Values, others: Values) -> Tuple[Sequence[int], Sequence[int]]:
+        if not len(others):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        size = (others[:, 2:] - others[:, :2]).max(axis=0)
+        cell_size = np.maximum(size, (boxes[:, 2:] - boxes[:, :2]).max(axis=0)) / 4
+        cell_size[cell_size == 0] = 1.0
+        corners = np.floor(others[:, :2] / cell_size).astype(np.int64)
+        first, last = np.floor((boxes[:, :2] - size) / cell_size).astype(np.int64), np.floor(boxes[:, 2:] / cell_size).astype(np.int64)
+
+        low = np.minimum(corners.min(axis=0), first.min(axis=0))
+        height = max(corners[:, 1].max(), last[:, 1].max()) - low[1] + 1
+        other_keys = (corners - low) @ (height, 1)
+        order = np.argsort(other_keys, kind="stable")
+        other_keys = other_keys[order]
+
+        columns = last[:, 0] - first[:, 0] + 1
+        box_ids = np.repeat(np.arange(len(boxes)), columns)
+        xs = first[box_ids, 0] - low[0] + np.arange(columns.sum()) - np.repeat(np.cumsum(columns) - columns, columns)
+        starts = np.searchsorted(other_keys, xs * height + first[box_ids, 1] - low[1], side="left")
+        ends = np.searchsorted(other_keys, xs * height + last[box_ids, 1] - low[1], side="right")
+        sizes = ends - starts
+
+        pair_boxes = np.repeat(box_ids, sizes)
+        pair_others = order[np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes) + np.repeat(starts, sizes)]
+        pair_box_values, pair_other_boxes = boxes[pair_boxes], others[pair_others]
+        keep = ((pair_box_values[:, :2] <= pair_other_boxes[:, 2:]) & (pair_other_boxes[:, :2] <= pair_box_values[:, 2:])).all(axis=1)
+        return pair_boxes[keep], pair_others[keep]
+
+    @staticmethod
+    def __get_areas(candidates: Values, others: Values) -> Values:
+        return LabelPlacer.__get_pair_areas(candidates[:, None, :], others[None, :, :]).sum(axis=1)
+
+    @staticmethod
+    def __get_pair_areas(boxes: Values, others: Values) -> Values:
+        widths = np.minimum(boxes[..., 2], others[..., 2]) - np.maximum(boxes[..., 0], others[..., 0])
+        heights = np.minimum(boxes[..., 3], others[..., 3]) - np.maximum(boxes[..., 1], others[..., 1])
+        return np.where((widths > 0) & (heights > 0), widths * heights, 0.0)
+
+    def __get_blocked(self, i: int) -> List[float]:
+        x, y, _, _ = self.labels[i]
+        boxes = [self.obstacles.boxes[j] for j in self.obstacles.query(*self.__get_union(i))]
+        boxes = [box for box in boxes if not (box[0] <= x <= box[2] and box[1] <= y <= box[3])]
+        return [self.__get_area(box, boxes) for box in self.boxes[i]]
+
+    def __get_union(self, i: int) -> Tuple[float, float, float, float]:
+        boxes = self.boxes[i]
+        return min(box[0] for box in boxes), min(box[1] for box in boxes), max(box[2] for box in boxes), max(box[3] for box in boxes)
+
+    def __get_boxes(self, x: float, y: float, w: float, h: float) -> List[Tuple[float, float, float, float]]:
+        return [(x + dx * w, y + dy * h, x + (dx + 1) * w, y + (dy + 1) * h) for dx, dy in self.offsets]
+
+    @staticmethod
+    def __get_area(box: Tuple[float, float, float, float], others: List[Tuple[float, float, float, float]], cost: float = 0.0, limit: float = math.inf) -> float:
+        x0, y0, x1, y1 = box
+
+        for box_x0, box_y0, box_x1, box_y1 in others:
+            if cost >= limit:
+                break
+
+            if box_x0 < x1 and x0 < box_x1 and box_y0 < y1 and y0 < box_y1:
+                cost += (min(x1, box_x1) - max(x0, box_x0)) * (min(y1, box_y1) - max(y0, box_y0))
+
+        return cost
+
+
+@dataclass
+class ShapeTable:
+    nodes: Dict[int, etree.Element] = field(default_factory=dict)
+    names: Dict[str, int] = field(default_factory=dict)
+    boxes: Dict[int, Tuple[float, float, float, float]] = field(default_factory=dict)
+    transforms: Dict[int, Tuple[float, float, float, float]] = field(default_factory=dict)
+
+    def add(self, node: etree.Element, box: Optional[Tuple[float, float, float, float]], transform: Tuple[float, float, float, float] = (1, 0, 1, 0)) -> int:
+        c_nv_pr = node[0][0]
+        shape_id = int(c_nv_pr.get("id"))
+
+        self.nodes[shape_id] = node
+        self.names.setdefault(c_nv_pr.get("name", ""), shape_id)
+        self.transforms[shape_id] = transform
+
+        if box is not None:
+            self.boxes[shape_id] = box
+
+        return shape_id
+
+    def get_id(self, shape: Union[int, str]) -> int:
+        shape_id = self.names.get(shape) if isinstance(shape, str) else shape
+
+        if shape_id not in self.nodes:
+            raise ValueError(f'Unknown shape "{shape}"')
+
+        return shape_id
+
 
 @dataclass
 class Slide:
     tree: etree.ElementTree
     sp_tree: etree.ElementTree
+    fragments: List[bytes] = field(default_factory=list)
+    token: str = field(default_factory=lambda: os.urandom(8).hex())
+
+    @property
+    def nsmap(self) -> dict:
+        return self.sp_tree.nsmap
+
+    def append(self, node: etree.Element, children: Optional[Iterable[etree.Element]] = None) -> None:
+        if children is not None:
+            node.extend(children)
+
+        self.sp_tree.append(node)
+
+    def append_raw(self, fragment: bytes) -> None:
+        self.sp_tree.append(etree.Comment(f"{self.token} {len(self.fragments)}"))
+        self.fragments.append(fragment)
+
+    def parse_fragments(self) -> None:
+        if not self.fragments:
+            return
+
+        namespaces = " ".join(f'xmlns:{prefix}="{namespace}"' if prefix else f'xmlns="{namespace}"' for prefix, namespace in self.nsmap.items())
+        placeholders = [node for node in self.sp_tree if node.tag is etree.Comment and node.text.startswith(self.token)]
+
+        for placeholder in placeholders:
+            nodes = etree.fromstring(f"<fragment {namespaces}>".encode() + self.fragments[int(placeholder.text.split()[1])] + b"</fragment>")
+            index = self.sp_tree.index(placeholder)
+            self.sp_tree[index:index + 1] = list(nodes)
+
+        self.fragments.clear()
+
+    def close(self) -> bytes:
+        data = etree.tostring(self.tree)
+
+        if not self.fragments:
+            return data
+
+        return re.sub(rb"<!--" + self.token.encode() + rb" (\d+)-->", lambda match: self.fragments[int(match[1])], data)
+
+
+class SlideStream:
+    def __init__(self, tree: etree.ElementTree, sp_tree: etree.Element, spool_size: int) -> None:
+        self.nsmap = sp_tree.nsmap
+        self.output = tempfile.SpooledTemporaryFile(max_size=spool_size)
+        self.writer = self.__write(tree=tree, sp_tree=sp_tree)
+        next(self.writer)
+
+    def append(self, node: etree.Element, children: Optional[Iterable[etree.Element]] = None) -> None:
+        self.writer.send((node, children))
+
+    def append_raw(self, fragment: bytes) -> None:
+        self.writer.send((fragment, None))
+
+    def close(self) -> BinaryIO:
+        try:
+            self.writer.send(None)
+        except StopIteration:
+            pass
+
+        self.output.seek(0)
+        return self.output
+
+    def __write(self, tree: etree.ElementTree, sp_tree: etree.Element) -> Generator[None, Optional[tuple], None]:
+        with etree.xmlfile(self.output, encoding="UTF-8") as xf:
+            xf.write_declaration(standalone=True)
+            yield from self.__write_element(xf, node=tree.getroot(), sp_tree=sp_tree, path={sp_tree, *sp_tree.iterancestors()}, nsmap={})
+
+    def __write_element(self, xf: etree.xmlfile, node: etree.Element, sp_tree: etree.Element, path: set, nsmap: dict) -> Generator[None, Optional[tuple], None]:
+        namespaces = {prefix: namespace for prefix, namespace in node.nsmap.items() if nsmap.get(prefix) != namespace}
+
+        with xf.element(node.tag, node.attrib, nsmap=namespaces):
+            for child in node:
+                if child in path:
+                    yield from self.__write_element(xf, node=child, sp_tree=sp_tree, path=path, nsmap=node.nsmap)
+                else:
+                    xf.flush()
+                    self.__write_child(child, declarations=self.__get_declarations(node.nsmap))
+
+            if node is not sp_tree:
+                return
+
+            declarations = self.__get_declarations(self.nsmap)
+            xf.flush()
+
+            while (item := (yield)) is not None:
+                shape, children = item
+
+                if isinstance(shape, bytes):
+                    self.output.write(shape)
+                    continue
+
+                if children is None:
+                    self.__write_child(shape, declarations=declarations)
+                    continue
+
+                with xf.element(shape.tag, shape.attrib):
+                    xf.flush()
+
+                    for child in shape:
+                        self.__write_child(child, declarations=declarations)
+
+                    for child in children:
+                        self.__write_child(child, declarations=declarations)
+
+                xf.flush()
+
+    def __write_child(self, node: etree.Element, declarations: List[bytes]) -> None:
+        xml = etree.tostring(node, encoding="UTF-8")
+
+        for declaration in declarations:
+            xml = xml.replace(declaration, b"", 1)
+
+        self.output.write(xml)
+
+    @staticmethod
+    def __get_declarations(nsmap: dict) -> List[bytes]:
+        return [f' xmlns{":" + prefix if prefix else ""}="{namespace}"'.encode() for prefix, namespace in nsmap.items()]
+
+
+class Template:
+    def __init__(self, source: bytes, key: Tuple[int, int]) -> None:
+        self.source = source
+        self.key = key
+        self.archive = zipfile.ZipFile(io.BytesIO(source), "r")
+        self.infos = {info.filename: info for info in self.archive.infolist() if not info.is_dir()}
+        self.trees: Dict[str, etree.ElementTree] = {}
+        self.lock = threading.Lock()
+
+    def parse(self, name: str) -> etree.ElementTree:
+        with self.lock:
+            if name not in self.trees:
+                self.trees[name] = etree.parse(io.BytesIO(self.archive.read(self.infos[name])))
+
+            return copy.deepcopy(self.trees[name])
+
+
+class TemplateCache:
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.templates: Dict[str, Template] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, path: str) -> Template:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = stat.st_mtime_ns, stat.st_size
+
+        with self.lock:
+            template = self.templates.get(path)
+
+            if template is None or template.key != key:
+                with open(path, "rb") as f:
+                    template = Template(source=f.read(), key=key)
+
+                self.templates[path] = template
+
+            self.templates.move_to_end(path)
+
+            while len(self.templates) > self.maxsize:
+                self.templates.popitem(last=False)
+
+            return template
+
+    def clear(self) -> None:
+        with self.lock:
+            self.templates.clear()
+
+
+template_cache = TemplateCache(maxsize=8)
+
+
+class Package:
+    raw_writes = hasattr(zipfile, "sizeFileHeader") and hasattr(zipfile.ZipInfo, "FileHeader")
+
+    def __init__(self, path: Union[str, BinaryIO], work_path: Optional[str] = None, spool_size: int = 16 * 1024 * 1024, templates: Optional[TemplateCache] = None) -> None:
+        self.work_path = work_path
+        self.spool_size = spool_size
+        self.parts: Dict[str, Union[bytes, BinaryIO]] = {}
+        self.compressed: Dict[str, tuple] = {}
+        self.infos: Dict[str, zipfile.ZipInfo] = {}
+        self.source = b""
+        self.template = templates.get(path) if templates is not None and isinstance(path, str) else None
+
+        if self.work_path is not None:
+            with zipfile.ZipFile(path if self.template is None else io.BytesIO(self.template.source), "r") as f:
+                f.extractall(self.work_path)
+            return
+
+        if self.template is not None:
+            self.source, self.archive, self.infos = self.template.source, self.template.archive, self.template.infos
+            return
+
+        if isinstance(path, str):
+            with open(path, "rb") as f:
+                self.source = f.read()
+        else:
+            self.source = path.read()
+
+        self.archive = zipfile.ZipFile(io.BytesIO(self.source), "r")
+        self.infos = {info.filename: info for info in self.archive.infolist() if not info.is_dir()}
+
+    def read(self, name: str) -> bytes:
+        if self.work_path is None:
+            if name not in self.parts:
+                return self.archive.read(self.infos[name])
+
+            data = self.parts[name]
+            if data is None:
+                return self.__decompress(self.compressed[name][-1])
+
+            if isinstance(data, bytes):
+                return data
+
+            data.seek(0)
+            return data.read()
+
+        with open(os.path.join(self.work_path, *name.split("/")), "rb") as f:
+            return f.read()
+
+    def parse(self, name: str) -> etree.ElementTree:
+        if self.work_path is None and self.template is not None and name not in self.parts:
+            return self.template.parse(name)
+
+        return etree.parse(io.BytesIO(self.read(name)))
+
+    def exists(self, name: str) -> bool:
+        if self.work_path is None:
+            return name in self.parts or name in self.infos
+
+        return os.path.isfile(os.path.join(self.work_path, *name.split("/")))
+
+    def write(self, name: str, data: Union[bytes, BinaryIO], compresslevel: Optional[int] = None) -> None:
+        if self.work_path is None:
+            self.parts[name] = data
+            self.compressed.pop(name, None)
+
+            if compresslevel is not None:
+                self.compressed[name] = (compresslevel, *self.__compress(data, compresslevel=compresslevel))
+                self.parts[name] = None
+            return
+
+        path = os.path.join(self.work_path, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "wb") as f:
+            if isinstance(data, bytes):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f)
+
+    def save(self, path: Union[str, BinaryIO], compresslevel: int = 9) -> None:
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as f:
+            if self.work_path is not None:
+                for root, _, files in os.walk(self.work_path):
+                    for file in files:
+                        f.write(os.path.join(root, file), os.path.relpath(os.path.join(root, file), self.work_path))
+                return
+
+            raw = self.raw_writes and all(hasattr(f, name) for name in ("fp", "filelist", "NameToInfo", "start_dir", "_didModify"))
+
+            for name, info in self.infos.items():
+                if name in self.parts:
+                    self.__write_member(f, zipfile.ZipInfo(name, date_time=info.date_time), compresslevel=compresslevel, raw=raw)
+                else:
+                    self.__copy_member(f, info, compresslevel=compresslevel, raw=raw)
+
+            for name in self.parts:
+                if name not in self.infos:
+                    self.__write_member(f, zipfile.ZipInfo(name), compresslevel=compresslevel, raw=raw)
+
+    def __write_member(self, f: zipfile.ZipFile, info: zipfile.ZipInfo, compresslevel: int, raw: bool) -> None:
+        if not raw:
+            f.writestr(info, self.read(info.filename), compress_type=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+            return
+
+        if self.compressed.get(info.filename, (None,))[0] != compresslevel:
+            data = self.parts[info.filename]
+            data = self.read(info.filename) if data is None else data
+            self.compressed[info.filename] = (compresslevel, *self.__compress(data, compresslevel=compresslevel))
+
+        _, info.CRC, info.file_size, info.compress_size, data = self.compressed[info.filename]
+        info.compress_type = zipfile.ZIP_DEFLATED
+        self.__write_raw(f, info, data)
+
+    def __compress(self, data: Union[bytes, BinaryIO], compresslevel: int) -> Tuple[int, int, int, Union[bytes, BinaryIO]]:
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+
+        if isinstance(data, bytes):
+            compressed = compressor.compress(data) + compressor.flush()
+            return zlib.crc32(data), len(data), len(compressed), compressed
+
+        output = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        crc, size = 0, 0
+        data.seek(0)
+
+        while chunk := data.read(1024 * 1024):
+            crc, size = zlib.crc32(chunk, crc), size + len(chunk)
+            output.write(compressor.compress(chunk))
+
+        output.write(compressor.flush())
+        return crc, size, output.tell(), output
+
+    def __decompress(self, data: Union[bytes, BinaryIO]) -> bytes:
+        if isinstance(data, bytes):
+            return zlib.decompress(data, -15)
+
+        decompressor = zlib.decompressobj(-15)
+        output = []
+        data.seek(0)
+
+        while chunk := data.read(1024 * 1024):
+            output.append(decompressor.decompress(chunk))
+
+        output.append(decompressor.flush())
+        return b"".join(output)
+
+    def __copy_member(self, f: zipfile.ZipFile, info: zipfile.ZipInfo, compresslevel: int, raw: bool) -> None:
+        if not raw:
+            member = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+            member.external_attr = info.external_attr
+            f.writestr(member, self.archive.read(info), compress_type=info.compress_type, compresslevel=compresslevel)
+            return
+
+        name_length, extra_length = struct.unpack("<2H", self.source[info.header_offset + 26:info.header_offset + 30])
+        start = info.header_offset + zipfile.sizeFileHeader + name_length + extra_length
+
+        member = copy.copy(info)
+        member.flag_bits &= ~0x08
+        self.__write_raw(f, member, memoryview(self.source)[start:start + info.compress_size])
+
+    def __write_raw(self, f: zipfile.ZipFile, member: zipfile.ZipInfo, data: Union[bytes, memoryview, BinaryIO]) -> None:
+        member.header_offset = f.fp.tell()
+        f.fp.write(member.FileHeader())
+
+        if isinstance(data, (bytes, memoryview)):
+            f.fp.write(data)
+        else:
+            data.seek(0)
+            shutil.copyfileobj(data, f.fp)
+
+        f.filelist.append(member)
+        f.NameToInfo[member.filename] = member
+        f.start_dir = f.fp.tell()
+        f._didModify = True
 
 
 class Presentation:
-    def __init__(self, presentation_path: str, work_path: str) -> None:
+    def __init__(
+        self,
+        presentation_path: Union[str, BinaryIO],
+        work_path: Optional[str] = None,
+        streaming: bool = False,
+        spool_size: int = 16 * 1024 * 1024,
+        vectorized: bool = True,
+        cache_size: int = 1024,
+        profile: bool = False,
+        max_slides: Optional[int] = None,
+        shared_templates: bool = True,
+        spatial_index: bool = False,
+        xml_backend: str = "lxml"
+    ) -> None:
+        if xml_backend not in {"lxml", "raw", "check"}:
+            raise ValueError(f'Unknown XML backend "{xml_backend}"')
+
         self.presentation_path = presentation_path
         self.work_path = work_path
-
-        with zipfile.ZipFile(presentation_path, "r") as f:
-            f.extractall(self.work_path)
+        self.streaming = streaming
+        self.spool_size = spool_size
+        self.cache_size = cache_size
+        self.max_slides = max_slides
+        self.xml_backend = xml_backend
+        self.compresslevel = 9
+        self.package = Package(path=presentation_path, work_path=work_path, spool_size=spool_size, templates=template_cache if shared_templates else None)
+        self.bbox = BBoxEngine(vectorized=vectorized)
+        self.stats = Stats() if profile else None
+        self.hooks: List[Callable[[str, float, dict], None]] = []
+        self.indexes: Optional[Dict[str, SpatialIndex]] = {} if spatial_index else None
+        self.tables: Dict[str, ShapeTable] = {}
+        self.first_ids: Dict[str, int] = {}
 
         self.namespaces = {
             "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
@@ -29,188 +1623,374 @@ class Presentation:
             "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
         }
 
-        self.slides = {}
+        self.package_namespaces = {
+            "ct": "http://schemas.openxmlformats.org/package/2006/content-types",
+            "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+        }
+        self.content_types = {
+            "slide": "application/vnd.openxmlformats-officedocument.presentationml.slide+xml",
+        }
+        self.relationship_types = {
+            "slide": "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide",
+            "slideLayout": "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout",
+        }
+
+        self.slides = OrderedDict()
+        self.parts = {}
+        self.dirty = set()
+        self.slide_size = None
         self.shape_id = 1
 
-    def add_line(self, line: dict, slide: str = "slide1") -> None:
-        self.__add_to_slide(self.make_line(line=line), slide=slide)
+        self.tags = {}
+        self.templates = LRUCache(maxsize=cache_size)
+        self.style_nodes = LRUCache(maxsize=cache_size)
+        self.raw_templates = LRUCache(maxsize=cache_size)
+        self.template_names = {"line": "Line", "ellipse": "Ellipse", "rectangle": "Rectangle", "polygon": "Polygon", "path": "Path"}
+        self.record_types = {record_type.kind: record_type for record_type in (Line, Ellipse, Rectangle, Polygon, Polyline, TextBox)}
+        self.style_keys = ("fill", "fill-opacity", "stroke", "stroke-opacity", "stroke-dash", "thickness", "opacity")
+        self.column_fields = {"line": ("x1", "y1", "x2", "y2"), "ellipse": ("x", "y", "d", "dx", "dy", "rotate"), "rectangle": ("x", "y", "w", "h", "radius", "rotate")}
+        self.required_fields = {"line": ("x1", "y1", "x2", "y2"), "ellipse": ("x", "y", "d"), "rectangle": ("x", "y", "w", "h")}
+
+    def add_slide(self, layout: Optional[str] = None) -> str:
+        presentation = self.__get_part("ppt/presentation.xml").getroot()
+        relationships = self.__get_part("ppt/_rels/presentation.xml.rels").getroot()
+        content_types = self.__get_part("[Content_Types].xml").getroot()
+
+        if layout is None:
+            layout = self.__get_default_layout(presentation, relationships)
+
+        if not self.package.exists(f"ppt/slideLayouts/{layout}.xml"):
+            raise ValueError(f'Unknown slide layout "{layout}"')
+
+        number = 1
+        while self.package.exists(f"ppt/slides/slide{number}.xml"):
+            number += 1
+
+        slide = f"slide{number}"
+        self.package.write(f"ppt/slides/{slide}.xml", self.__make_slide())
+        self.package.write(f"ppt/slides/_rels/{slide}.xml.rels", self.__make_relationships([("rId1", "slideLayout", f"../slideLayouts/{layout}.xml")]))
 
-    def add_ellipse(self, ellipse: dict, slide: str = "slide1") -> None:
-        self.__add_to_slide(self.make_ellipse(ellipse=ellipse), slide=slide)
+        relationship_ids = [int(node.get("Id")[3:]) for node in relationships if node.get("Id", "").startswith("rId") and node.get("Id")[3:].isdigit()]
+        relationship_id = f"rId{max(relationship_ids, default=0) + 1}"
+        relationship = etree.SubElement(relationships, f"{{{self.package_namespaces['rel']}}}Relationship", Id=relationship_id)
+        relationship.set("Type", self.relationship_types["slide"])
+        relationship.set("Target", f"slides/{slide}.xml")
 
-    def add_rectangle(self, rectangle: dict, slide: str = "slide1") -> None:
-        self.__add_to_slide(self.make_rectangle(rectangle=rectangle), slide=slide)
+        slide_list = self.__get_slide_list(presentation)
+        slide_id = str(max((int(node.get("id")) for node in slide_list), default=255) + 1)
+        self.__element("p:sldId", {"id": slide_id, self.__tag("r:id"): relationship_id}, parent=slide_list)
 
-    def add_polygon(self, polygon: dict, slide: str = "slide1") -> None:
-        self.__add_to_slide(self.make_polygon(polygon=polygon), slide=slide)
+        etree.SubElement(content_types, f"{{{self.package_namespaces['ct']}}}Override", PartName=f"/ppt/slides/{slide}.xml", ContentType=self.content_types["slide"])
+        self.dirty.update(["ppt/presentation.xml", "ppt/_rels/presentation.xml.rels", "[Content_Types].xml"])
+        return slide
 
-    def add_textbox(self, textbox: dict, slide: str = "slide1") -> None:
-        self.__add_to_slide(self.make_textbox(textbox=textbox), slide=slide)
+    def add_line(self, line: Union[dict, Line], slide: str = "slide1") -> None:
+        with self.__profile("make", slide=slide):
+            node = self.make_line(line=line)
 
-    def add_lines(self, lines: List[dict], slide: str = "slide1") -> None:
+        self.__add_to_slide(node, slide=slide)
+
+    def add_ellipse(self, ellipse: Union[dict, Ellipse], slide: str = "slide1") -> None:
+        with self.__profile("make", slide=slide):
+            node = self.make_ellipse(ellipse=ellipse)
+
+        self.__add_to_slide(node, slide=slide)
+
+    def add_rectangle(self, rectangle: Union[dict, Rectangle], slide: str = "slide1") -> None:
+        with self.__profile("make", slide=slide):
+            node = self.make_rectangle(rectangle=rectangle)
+
+        self.__add_to_slide(node, slide=slide)
+
+    def add_polygon(self, polygon: Union[dict, Polygon], slide: str = "slide1") -> None:
+        with self.__profile("make", slide=slide):
+            node = self.make_polygon(polygon=polygon)
+
+        self.__add_to_slide(node, slide=slide)
+
+    def add_polyline(self, polyline: Union[dict, Polyline], slide: str = "slide1") -> None:
+        with self.__profile("make", slide=slide):
+            node = self.make_polyline(polyline=polyline)
+
+        self.__add_to_slide(node, slide=slide)
+
+    def add_textbox(self, textbox: Union[dict, TextBox], slide: str = "slide1") -> None:
+        with self.__profile("make", slide=slide):
+            node = self.make_textbox(textbox=textbox)
+
+        self.__add_to_slide(node, slide=slide)
+
+    def add_lines(
+        self,
+        lines: List[Union[dict, Line]],
+        slide: str = "slide1",
+        resolution: Optional[float] = None,
+        compact: bool = False,
+        viewport: Optional[Viewport] = None
+    ) -> int:
         if not lines:
-            return
+            return 0
 
-        x, y, width, height = self.__get_lines_bbox(lines=lines)
-        group = self.make_group(x=x, y=y, width=width, height=height)
+        lines, count = [self.__get_record(line, Line) for line in lines], len(lines)
+        if viewport is not None:
+            lines = self.__view_shapes(lines, viewport=viewport)
+
+        if resolution is not None:
+            lines = self.__decimate_lines(lines, resolution=resolution)
 
-        for line in lines:
-            group.append(self.make_line(line=line))
+        with self.__profile("bbox", slide=slide):
+            boxes = self.__get_lines_boxes(lines=lines)
+            x, y, width, height = self.bbox.union(boxes)
 
-        self.__add_to_slide(group, slide=slide)
+        if compact:
+            group = self.make_group(x=x, y=y, width=width, height=height)
+            self.__add_to_slide(group, slide=slide, children=self.__make_compact_lines(lines, boxes=self.bbox.rows(boxes)))
+        else:
+            self.__add_group_specs((x, y, width, height), specs=(self.__get_record_spec(line) for line in lines), slide=slide, boxes=boxes)
 
-    def add_ellipses(self, ellipses: List[dict], slide: str = "slide1") -> None:
+        return self.__get_removed("line", count - len(lines))
+
+    def add_ellipses(self, ellipses: List[Union[dict, Ellipse]], slide: str = "slide1", resolution: Optional[float] = None, viewport: Optional[Viewport] = None) -> int:
         if not ellipses:
-            return
+            return 0
 
-        x, y, width, height = self.__get_ellipses_bbox(ellipses=ellipses)
-        group = self.make_group(x=x, y=y, width=width, height=height)
+        ellipses, count = [self.__get_record(ellipse, Ellipse) for ellipse in ellipses], len(ellipses)
+        if viewport is not None:
+            ellipses = self.__view_shapes(ellipses, viewport=viewport)
+
+        if resolution is not None:
+            ellipses = self.__decimate_ellipses(ellipses, resolution=resolution)
 
-        for ellipse in ellipses:
-            group.append(self.make_ellipse(ellipse=ellipse))
+        with self.__profile("bbox", slide=slide):
+            boxes = self.__get_ellipses_boxes(ellipses=ellipses)
+            x, y, width, height = self.bbox.union(boxes)
 
-        self.__add_to_slide(group, slide=slide)
+        self.__add_group_specs((x, y, width, height), specs=(self.__get_record_spec(ellipse) for ellipse in ellipses), slide=slide, boxes=boxes)
+        return self.__get_removed("ellipse", count - len(ellipses))
 
-    def add_rectangles(self, rectangles: List[dict], slide: str = "slide1") -> None:
+    def add_rectangles(self, rectangles: List[Union[dict, Rectangle]], slide: str = "slide1", viewport: Optional[Viewport] = None) -> None:
         if not rectangles:
             return
 
-        x, y, width, height = self.__get_rectangles_bbox(rectangles=rectangles)
-        group = self.make_group(x=x, y=y, width=width, height=height)
+        rectangles = [self.__get_record(rectangle, Rectangle) for rectangle in rectangles]
+        if viewport is not None:
+            rectangles = self.__view_shapes(rectangles, viewport=viewport)
 
-        for rectangle in rectangles:
-            group.append(self.make_rectangle(rectangle=rectangle))
+        with self.__profile("bbox", slide=slide):
+            boxes = self.__get_rectangles_boxes(rectangles=rectangles)
+            x, y, width, height = self.bbox.union(boxes)
 
-        self.__add_to_slide(group, slide=slide)
+        self.__add_group_specs((x, y, width, height), specs=(self.__get_record_spec(rectangle) for rectangle in rectangles), slide=slide, boxes=boxes)
 
-    def add_polygons(self, polygons: List[dict], slide: str = "slide1") -> None:
+    def add_polygons(self, polygons: List[Union[dict, Polygon]], slide: str = "slide1", compact: bool = False, viewport: Optional[Viewport] = None) -> None:
         if not polygons:
             return
 
-        x, y, width, height = self.__get_polygons_bbox(polygons=polygons)
-        group = self.make_group(x=x, y=y, width=width, height=height)
+        polygons = [self.__get_record(polygon, Polygon) for polygon in polygons]
+        if viewport is not None:
+            polygons = self.__view_paths(polygons, viewport=viewport)
 
-        for polygon in polygons:
-            group.append(self.make_polygon(polygon=polygon))
+        with self.__profile("bbox", slide=slide):
+            boxes = self.__get_polygons_boxes(polygons=polygons)
+            x, y, width, height = self.bbox.union(boxes)
 
-        self.__add_to_slide(group, slide=slide)
+        group = self.make_group(x=x, y=y, width=width, height=height)
 
-    def add_textboxes(self, textboxes: List[dict], slide: str = "slide1") -> None:
-        if not textboxes:
+        if compact:
+            self.__add_to_slide(group, slide=slide, children=self.__make_compact_polygons(polygons, boxes=self.bbox.rows(boxes)))
+        else:
+            self.__add_to_slide(group, slide=slide, children=(self.__make_polygon(polygon, box=box) for polygon, box in zip(polygons, self.bbox.rows(boxes))), boxes=boxes)
+
+    def add_polylines(self, polylines: List[Union[dict, Polyline]], slide: str = "slide1", viewport: Optional[Viewport] = None) -> None:
+        if not polylines:
             return
 
-        x, y, width, height = self.__get_textboxes_bbox(textboxes=textboxes)
+        polylines = [self.__get_record(polyline, Polyline) for polyline in polylines]
+        if viewport is not None:
+            polylines = self.__view_paths(polylines, viewport=viewport)
+
+        with self.__profile("bbox", slide=slide):
+            boxes = self.__get_polylines_boxes(polylines=polylines)
+            x, y, width, height = self.bbox.union(boxes)
+
         group = self.make_group(x=x, y=y, width=width, height=height)
 
-        for textbox in textboxes:
-            group.append(self.make_textbox(textbox=textbox))
+        children = (self.__make_polyline(polyline, box=box) for polyline, box in zip(polylines, self.bbox.rows(boxes)))
+        self.__add_to_slide(group, slide=slide, children=children, boxes=boxes)
+
+    def add_textboxes(
+        self,
+        textboxes: List[Union[dict, TextBox]],
+        slide: str = "slide1",
+        placement: Optional[str] = None,
+        offsets: Optional[Sequence[Tuple[float, float]]] = None,
+        drop: bool = False
+    ) -> int:
+        if not textboxes:
+            return 0
+
+        textboxes = [self.__get_record(textbox, TextBox) for textbox in textboxes]
+        overlapped = 0
+        if placement is not None:
+            textboxes, overlapped = self.__place_textboxes(textboxes, slide=slide, placement=placement, offsets=offsets, drop=drop)
+
+            if not textboxes:
+                return overlapped
 
-        self.__add_to_slide(group, slide=slide)
+        with self.__profile("bbox", slide=slide):
+            boxes = self.__get_textboxes_boxes(textboxes=textboxes)
+            x, y, width, height = self.bbox.union(boxes)
 
-    def add_shapes(self, shapes: List[dict], slide: str = "slide1") -> None:
+        group = self.make_group(x=x, y=y, width=width, height=height)
+
+        self.__add_to_slide(group, slide=slide, children=(self.make_textbox(textbox=textbox) for textbox in textboxes), boxes=boxes)
+        return overlapped
+
+    def add_shapes(self, shapes: List[Union[dict, Shape]], slide: str = "slide1") -> None:
         if not shapes:
             return
 
-        x, y, width, height = self.__get_shapes_bbox(shapes=shapes)
-        group = self.make_group(x=x, y=y, width=width, height=height)
+        shapes = [self.__get_record(shape) for shape in shapes]
 
-        for shape in shapes:
-            group.append(self.make_shape(shape=shape))
+        with self.__profile("bbox", slide=slide):
+            boxes = self.__get_shapes_boxes(shapes=shapes)
+            x, y, width, height = self.bbox.union(*boxes.values())
 
-        self.__add_to_slide(group, slide=slide)
+        group = self.make_group(x=x, y=y, width=width, height=height)
 
-    def make_line(self, line: dict) -> etree.Element:
-        line_node = self.__element("p:cxnSp")
+        polygon_boxes = iter(self.bbox.rows(boxes["polygon"]) if "polygon" in boxes else [])
+        polyline_boxes = iter(self.bbox.rows(boxes["polyline"]) if "polyline" in boxes else [])
+        self.__add_to_slide(group, slide=slide, children=(self.__make_shape(shape, polygon_boxes=polygon_boxes, polyline_boxes=polyline_boxes) for shape in shapes))
 
-        nvcxnsppr = self.__element("p:nvCxnSpPr", parent=line_node)
-        self.__element("p:cNvPr", {"id": str(self.shape_id), "name": f"Line {self.shape_id}"}, parent=nvcxnsppr)
-        self.__element("p:cNvCxnSpPr", parent=nvcxnsppr)
-        self.__element("p:nvPr", parent=nvcxnsppr)
+    def add_group(self, group: etree.Element, children: Iterable[etree.Element], slide: str = "slide1") -> None:
+        self.__add_to_slide(group, slide=slide, children=(self.__renumber(child, slide=slide) for child in children))
 
-        x1, y1, x2, y2 = line["x1"], line["y1"], line["x2"], line["y2"]
-        x, y, w, h = min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1)
+    def add_lines_columns(self, columns: dict, slide: str = "slide1", viewport: Optional[Viewport] = None) -> None:
+        columns = Columns(columns, vectorized=self.bbox.vectorized)
+        if columns.size == 0:
+            return
 
-        sppr = self.__element("p:spPr", parent=line_node)
-        self.__set_xfrm(sppr, {"flipH": "0" if x1 <= x2 else "1", "flipV": "0" if y1 <= y2 else "1"}, x=x, y=y, cx=w, cy=h)
-        self.__element("a:avLst", parent=self.__element("a:prstGeom", {"prst": "line"}, parent=sppr))
+        x1, y1, x2, y2 = columns.numbers("x1"), columns.numbers("y1"), columns.numbers("x2"), columns.numbers("y2")
+        if viewport is not None:
+            (x1, y1), (x2, y2) = viewport.points(x1, y1), viewport.points(x2, y2)
+
+        with self.__profile("bbox", slide=slide):
+            boxes = self.bbox.lines(x1=x1, y1=y1, x2=x2, y2=y2)
+            x, y, width, height = self.bbox.union(boxes)
+
+        if columns.vectorized:
+            frame = [np.minimum(x1, x2), np.minimum(y1, y2), np.abs(x2 - x1), np.abs(y2 - y1)]
+            flip_h, flip_v = (x1 > x2).tolist(), (y1 > y2).tolist()
+        else:
+            frame = [list(map(min, x1, x2)), list(map(min, y1, y2)), [abs(b - a) for a, b in zip(x1, x2)], [abs(b - a) for a, b in zip(y1, y2)]]
+            flip_h, flip_v = [a > b for a, b in zip(x1, x2)], [a > b for a, b in zip(y1, y2)]
+
+        coordinates = [self.__get_coordinates(values) for values in frame]
+        lines = zip(*coordinates, flip_h, flip_v, self.__get_styles(columns))
+        specs = (self.__get_line_spec(x1, y1, cx, cy, flip_h=flip_h, flip_v=flip_v, style=style) for x1, y1, cx, cy, flip_h, flip_v, style in lines)
+        self.__add_group_specs((x, y, width, height), specs=specs, slide=slide, boxes=boxes)
+
+    def add_ellipses_columns(self, columns: dict, slide: str = "slide1", viewport: Optional[Viewport] = None) -> None:
+        columns = Columns(columns, vectorized=self.bbox.vectorized)
+        if columns.size == 0:
+            return
 
-        self.__set_stroke(sppr, config=line)
-        self.shape_id += 1
+        x, y, rotate = columns.numbers("x"), columns.numbers("y"), columns.numbers("rotate", 0)
+        dx, dy = columns.numbers("dx" if "dx" in columns else "d"), columns.numbers("dy" if "dy" in columns else "d")
+        if viewport is not None:
+            x, y = viewport.ellipses(x, y, dx, dy)
 
-        return line_node
+        with self.__profile("bbox", slide=slide):
+            boxes = self.bbox.ellipses(x=x, y=y, dx=dx, dy=dy, rotate=rotate)
+            bbox_x, bbox_y, width, height = self.bbox.union(boxes)
 
-    def make_ellipse(self, ellipse: dict) -> etree.Element:
-        ellipse_node = self.__element("p:sp")
+        coordinates = [self.__get_coordinates(values) for values in (x, y, dx, dy)]
+        ellipses = zip(*coordinates, self.__get_angles(rotate), self.__get_styles(columns))
+        specs = (self.__get_ellipse_spec(x, y, cx, cy, rot=rot, style=style) for x, y, cx, cy, rot, style in ellipses)
+        self.__add_group_specs((bbox_x, bbox_y, width, height), specs=specs, slide=slide, boxes=boxes)
 
-        nvsppr = self.__element("p:nvSpPr", parent=ellipse_node)
-        self.__element("p:cNvPr", {"id": str(self.shape_id), "name": f"Ellipse {self.shape_id}"}, parent=nvsppr)
-        self.__element("p:cNvSpPr", parent=nvsppr)
-        self.__element("p:nvPr", parent=nvsppr)
+    def add_rectangles_columns(self, columns: dict, slide: str = "slide1", viewport: Optional[Viewport] = None) -> None:
+        columns = Columns(columns, vectorized=self.bbox.vectorized)
+        if columns.size == 0:
+            return
 
-        dx, dy = self.__get_diameter(ellipse, key="dx"), self.__get_diameter(ellipse, key="dy")
+        x, y, w, h, rotate = columns.numbers("x"), columns.numbers("y"), columns.numbers("w"), columns.numbers("h"), columns.numbers("rotate", 0)
+        if viewport is not None:
+            x, y, w, h = viewport.rectangles(x, y, w, h)
 
-        sppr = self.__element("p:spPr", parent=ellipse_node)
-        self.__set_xfrm(sppr, {"rot": self.__get_angle(ellipse.get("rotate", 0))}, x=ellipse["x"], y=ellipse["y"], cx=dx, cy=dy)
-        self.__element("a:avLst", parent=self.__element("a:prstGeom", {"prst": "ellipse"}, parent=sppr))
+        with self.__profile("bbox", slide=slide):
+            boxes = self.bbox.rectangles(x=x, y=y, w=w, h=h, rotate=rotate)
+            bbox_x, bbox_y, width, height = self.bbox.union(boxes)
 
-        self.__set_fill(sppr, config=ellipse)
-        self.__set_stroke(sppr, config=ellipse)
-        self.shape_id += 1
+        coordinates = [self.__get_coordinates(values) for values in (x, y, w, h)]
+        rectangles = zip(*coordinates, self.__get_angles(rotate), self.__get_radius_fractions(columns.numbers("radius", 0)), self.__get_styles(columns))
+        specs = (self.__get_rectangle_spec(x, y, cx, cy, rot=rot, adj=adj, style=style) for x, y, cx, cy, rot, adj, style in rectangles)
+        self.__add_group_specs((bbox_x, bbox_y, width, height), specs=specs, slide=slide, boxes=boxes)
 
-        return ellipse_node
+    def import_shapes(
+        self,
+        path: str,
+        shape: str = "ellipse",
+        mapping: Optional[Dict[str, Union[str, int]]] = None,
+        defaults: Optional[dict] = None,
+        transform: Optional[Callable[[Values, Values], Tuple[Values, Values]]] = None,
+        chunk_size: int = 65536,
+        slide: str = "slide1",
+        viewport: Optional[Viewport] = None
+    ) -> int:
+        if shape not in self.column_fields:
+            raise ValueError(f'Unknown shape type "{shape}"')
 
-    def make_rectangle(self, rectangle: dict) -> etree.Element:
-        rectangle_node = self.__element("p:sp")
+        mapping, defaults = mapping or {}, defaults or {}
+        fields = self.column_fields[shape] + self.style_keys
 
-        nvsppr = self.__element("p:nvSpPr", parent=rectangle_node)
-        self.__element("p:cNvPr", {"id": str(self.shape_id), "name": f"Rectangle {self.shape_id}"}, parent=nvsppr)
-        self.__element("p:cNvSpPr", parent=nvsppr)
-        self.__element("p:nvPr", parent=nvsppr)
+        if unknown := [field for field in mapping if field not in fields]:
+            raise ValueError(f'Unknown {shape} fields: {", ".join(unknown)}')
 
-        sppr = self.__element("p:spPr", parent=rectangle_node)
-        self.__set_xfrm(sppr, {"rot": self.__get_angle(rectangle.get("rotate", 0))}, x=rectangle["x"], y=rectangle["y"], cx=rectangle["w"], cy=rectangle["h"])
+        reader = TableReader(path, chunk_size=chunk_size)
+        columns = {field: mapping.get(field, field) for field in fields if field in mapping or field not in defaults and field in reader.names}
+        if not columns:
+            raise ValueError(f'No columns of "{path}" match {shape} fields')
 
-        geom = self.__element("a:prstGeom", {"prst": "roundRect"}, parent=sppr)
-        avlst = self.__element("a:avLst", parent=geom)
-        self.__element("a:gd", {"name": "adj", "fmla": f'val {self.__get_fraction(rectangle.get("radius", 0) / 2)}'}, parent=avlst)
+        available = set(columns) | set(defaults) | ({"d"} if {"dx", "dy"} <= set(columns) | set(defaults) else set())
+        if missing := [field for field in self.required_fields[shape] if field not in available]:
+            raise ValueError(f'Missing {shape} fields: {", ".join(missing)}')
 
-        self.__set_fill(sppr, config=rectangle)
-        self.__set_stroke(sppr, config=rectangle)
-        self.shape_id += 1
+        add_columns = {"line": self.add_lines_columns, "ellipse": self.add_ellipses_columns, "rectangle": self.add_rectangles_columns}[shape]
+        points = [("x1", "y1"), ("x2", "y2")] if shape == "line" else [("x", "y")]
+        count = 0
 
-        return rectangle_node
+        for chunk in reader.chunks(columns, numeric=[field for field in columns if field not in {"fill", "stroke", "stroke-dash"}]):
+            count += len(next(iter(chunk.values())))
+            chunk = {**defaults, **chunk}
 
-    def make_polygon(self, polygon: dict) -> etree.Element:
-        x, y, width, height = self.__get_polygons_bbox(polygons=[polygon])
+            if transform is not None:
+                for x, y in points:
+                    chunk[x], chunk[y] = transform(chunk[x], chunk[y])
 
-        polygon_node = self.__element("p:sp")
+            add_columns(chunk, slide=slide, viewport=viewport)
 
-        nvsppr = self.__element("p:nvSpPr", parent=polygon_node)
-        self.__element("p:cNvPr", {"id": str(self.shape_id), "name": f"Polygon {self.shape_id}"}, parent=nvsppr)
-        self.__element("p:cNvSpPr", parent=nvsppr)
-        self.__element("p:nvPr", parent=nvsppr)
+        return count
 
-        sppr = self.__element("p:spPr", parent=polygon_node)
-        self.__set_xfrm(sppr, {"rot": self.__get_angle(polygon.get("rotate", 0))}, x=x, y=y, cx=width, cy=height)
+    def make_line(self, line: Union[dict, Line]) -> etree.Element:
+        return self.__make_from_template(*self.__get_record_spec(self.__get_record(line, Line)))
 
-        cust_geom = self.__element("a:custGeom", parent=sppr)
-        self.__element("a:avLst", parent=cust_geom)
-        self.__element("a:ahLst", parent=cust_geom)
-        self.__element("a:rect", {"b": "b", "l": "l", "r": "r", "t": "t"}, parent=cust_geom)
+    def make_ellipse(self, ellipse: Union[dict, Ellipse]) -> etree.Element:
+        return self.__make_from_template(*self.__get_record_spec(self.__get_record(ellipse, Ellipse)))
 
-        path = self.__element("a:path", {"w": self.__get_coordinate(width), "h": self.__get_coordinate(height)}, parent=self.__element("a:pathLst", parent=cust_geom))
-        for i, point in enumerate(polygon["points"]):
-            to = self.__element("a:moveTo" if i == 0 else "a:lnTo", parent=path)
-            self.__element("a:pt", {"x": self.__get_coordinate(point["x"] - x), "y": self.__get_coordinate(point["y"] - y)}, parent=to)
-        self.__element("a:close", parent=path)
+    def make_rectangle(self, rectangle: Union[dict, Rectangle]) -> etree.Element:
+        return self.__make_from_template(*self.__get_record_spec(self.__get_record(rectangle, Rectangle)))
 
-        self.__set_fill(sppr, config=polygon)
-        self.__set_stroke(sppr, config=polygon)
-        self.shape_id += 1
+    def make_polygon(self, polygon: Union[dict, Polygon]) -> etree.Element:
+        polygon = self.__get_record(polygon, Polygon)
+        return self.__make_polygon(polygon, box=self.bbox.rows(self.__get_polygons_boxes(polygons=[polygon]))[0])
 
-        return polygon_node
+    def make_polyline(self, polyline: Union[dict, Polyline]) -> etree.Element:
+        polyline = self.__get_record(polyline, Polyline)
+        return self.__make_polyline(polyline, box=self.bbox.rows(self.__get_polylines_boxes(polylines=[polyline]))[0])
 
-    def make_textbox(self, textbox: dict) -> etree.Element:
+    def make_textbox(self, textbox: Union[dict, TextBox]) -> etree.Element:
+        textbox = self.__get_record(textbox, TextBox)
         textbox_node = self.__element("p:sp")
 
         nvsppr = self.__element("p:nvSpPr", parent=textbox_node)
@@ -219,259 +1999,1057 @@ class Presentation:
         self.__element("p:nvPr", parent=nvsppr)
 
         sppr = self.__element("p:spPr", parent=textbox_node)
-        self.__set_xfrm(sppr, {"rot": self.__get_angle(textbox.get("rotate", 0))}, x=textbox["x"], y=textbox["y"], cx=textbox["w"], cy=textbox["h"])
+        coordinates = self.__get_coordinate(textbox.x), self.__get_coordinate(textbox.y), self.__get_coordinate(textbox.w), self.__get_coordinate(textbox.h)
+        self.__set_xfrm(sppr, {"rot": self.__get_angle(textbox.rotate)}, *coordinates)
         self.__element("a:avLst", parent=self.__element("a:prstGeom", {"prst": "rect"}, parent=sppr))
 
         tx_body = self.__element("p:txBody", parent=textbox_node)
-        margin = textbox.get("margin", {"left": 0, "right": 0, "top": 0, "bottom": 0})
+        left, right, top, bottom = textbox.margin
         body_attributes = {
-            "anchor": self.__get_alignment(textbox.get("vertical-align", "center")),
+            "anchor": self.__get_alignment(textbox.vertical_align),
             "anchorCtr": "0",
             "rtlCol": "0",
-            "bIns": self.__get_coordinate(margin.get("bottom", 0.1)),
-            "lIns": self.__get_coordinate(margin.get("left", 0.25)),
-            "rIns": self.__get_coordinate(margin.get("right", 0.25)),
-            "tIns": self.__get_coordinate(margin.get("top", 0.1)),
+            "bIns": self.__get_coordinate(bottom),
+            "lIns": self.__get_coordinate(left),
+            "rIns": self.__get_coordinate(right),
+            "tIns": self.__get_coordinate(top),
             "wrap": "square"
         }
 
         body_pr = self.__element("a:bodyPr", body_attributes, parent=tx_body)
-        self.__element("a:spAutoFit" if textbox.get("auto-fit", False) else "a:noAutoFit", parent=body_pr)
+        self.__element("a:spAutoFit" if textbox.auto_fit else "a:noAutoFit", parent=body_pr)
         self.__element("a:lstStyle", parent=tx_body)
 
-        text_attributes = self.__get_text_formatting(formatting=textbox)
+        text_attributes = self.__get_text_formatting(textbox=textbox)
 
-        for line in textbox["text"].split("\n"):
+        for line in textbox.text.split("\n"):
             p = self.__element("a:p", parent=tx_body)
-            self.__element("a:pPr", {"algn": self.__get_alignment(textbox["align"])}, parent=p)
+            self.__element("a:pPr", {"algn": self.__get_alignment(textbox.align)}, parent=p)
             r = self.__element("a:r", parent=p)
             rpr = self.__element("a:rPr", {"smtClean": "0", **text_attributes}, parent=r)
 
-            if "color" in textbox:
-                self.__element("a:srgbClr", {"val": self.__get_color(textbox["color"])}, parent=self.__element("a:solidFill", parent=rpr))
+            if textbox.color is not None:
+                self.__element("a:srgbClr", {"val": self.__get_color(textbox.color)}, parent=self.__element("a:solidFill", parent=rpr))
 
             self.__element("a:t", parent=r).text = line
             self.__element("a:endParaRPr", text_attributes, parent=p)
 
-        self.__set_fill(sppr, config=textbox)
-        self.__set_stroke(sppr, config=textbox)
+        self.__set_fill(sppr, style=textbox.style)
+        self.__set_stroke(sppr, style=textbox.style)
         self.shape_id += 1
 
         return textbox_node
 
-    def make_shape(self, shape: dict) -> etree.Element:
-        if shape["shape"] == "line":
+    def make_shape(self, shape: Union[dict, Shape]) -> etree.Element:
+        shape = self.__get_record(shape)
+
+        if shape.kind == "line":
             return self.make_line(line=shape)
 
-        if shape["shape"] == "ellipse":
+        if shape.kind == "ellipse":
             return self.make_ellipse(ellipse=shape)
 
-        if shape["shape"] == "rectangle":
+        if shape.kind == "rectangle":
             return self.make_rectangle(rectangle=shape)
 
-        if shape["shape"] == "polygon":
+        if shape.kind == "polygon":
             return self.make_polygon(polygon=shape)
 
-        if shape["shape"] == "textbox":
-            return self.make_textbox(textbox=shape)
+        if shape.kind == "polyline":
+            return self.make_polyline(polyline=shape)
 
-        raise ValueError(f'Unknown shape type "{shape["shape"]}"')
+        return self.make_textbox(textbox=shape)
 
     def make_group(self, x: float, y: float, width: float, height: float) -> etree.Element:
+        coordinates = self.__get_coordinate(x), self.__get_coordinate(y), self.__get_coordinate(width), self.__get_coordinate(height)
+        group_node = self.__make_group(str(self.shape_id), *coordinates)
+        self.shape_id += 1
+
+        return group_node
+
+    def save(self, path: Union[str, BinaryIO], compresslevel: int = 9) -> None:
+        for name, slide in self.slides.items():
+            if f"ppt/slides/{name}.xml" in self.dirty:
+                with self.__profile("serialize", slide=name):
+                    self.package.write(f"ppt/slides/{name}.xml", slide.close())
+
+        for name, tree in self.parts.items():
+            if name in self.dirty:
+                self.package.write(name, etree.tostring(tree, xml_declaration=True, encoding="UTF-8", standalone=True))
+
+        self.slides = OrderedDict((name, slide) for name, slide in self.slides.items() if isinstance(slide, Slide))
+        self.dirty.clear()
+        self.compresslevel = compresslevel
+
+        if self.stats is None:
+            self.package.save(path, compresslevel=compresslevel)
+            return
+
+        start = time.perf_counter()
+        offset = 0 if isinstance(path, str) else path.tell()
+        self.package.save(path, compresslevel=compresslevel)
+        size = os.path.getsize(path) if isinstance(path, str) else path.tell() - offset
+
+        self.stats.bytes_written += size
+        self.__record("write", time.perf_counter() - start, {"bytes": size})
+
+    def add_hook(self, hook: Callable[[str, float, dict], None]) -> None:
+        if self.stats is None:
+            self.stats = Stats()
+
+        self.hooks.append(hook)
+
+    def get_shapes(self, slide: str = "slide1") -> List[dict]:
+        table = self.__get_table(slide)
+        return [self.__get_shape_info(table, shape_id) for shape_id in table.nodes]
+
+    def get_shape(self, shape: Union[int, str], slide: str = "slide1") -> dict:
+        table = self.__get_table(slide)
+        return self.__get_shape_info(table, table.get_id(shape))
+
+    def update_shape(self, shape: Union[int, str], changes: dict, slide: str = "slide1") -> None:
+        table = self.__get_table(slide)
+        shape_id = table.get_id(shape)
+        node = table.nodes[shape_id]
+
+        if any(key in changes for key in ("x", "y", "w", "h", "rotate", "x1", "y1", "x2", "y2")):
+            self.__update_geometry(node, changes, transform=table.transforms[shape_id])
+
+        if any(key in changes for key in ("fill", "stroke", "thickness")):
+            self.__update_style(node, changes)
+
+        self.dirty.add(f"ppt/slides/{slide}.xml")
+        self.__track_shape(node, slide=slide, box=None, transform=table.transforms[shape_id])
+
+        if node.tag == self.__tag("p:grpSp"):
+            self.__scan_shapes(node, slide=slide, transform=self.__get_group_transform(node, table.transforms[shape_id]))
+
+    def index(self, slide: str = "slide1") -> SpatialIndex:
+        if self.indexes is None:
+            raise ValueError("Spatial index is disabled, create the presentation with spatial_index=True")
+
+        if slide not in self.indexes:
+            self.indexes[slide] = SpatialIndex()
+
+        return self.indexes[slide]
+
+    def export_slide(self, slide: str = "slide1") -> bytes:
+        if slide in self.slides:
+            with self.__profile("serialize", slide=slide):
+                self.package.write(f"ppt/slides/{slide}.xml", self.slides.pop(slide).close())
+
+            self.tables.pop(slide, None)
+
+        return self.package.read(f"ppt/slides/{slide}.xml")
+
+    def render_slides(self, builder: Callable[["Presentation", str], None], slides: Sequence[str], processes: Optional[int] = None) -> None:
+        options = {"vectorized": self.bbox.vectorized, "cache_size": self.cache_size, "xml_backend": self.xml_backend}
+        name = "ppt/presentation.xml"
+        presentation = etree.tostring(self.parts[name]) if name in self.parts else self.package.read(name)
+        tasks = [(slide, {f"ppt/slides/{slide}.xml": self.export_slide(slide), name: presentation}, builder, options) for slide in slides]
+
+        with self.__profile("render", slides=len(tasks)):
+            if processes == 1:
+                results = [render_slide(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=processes) as executor:
+                    results = list(executor.map(render_slide, tasks))
+
+        for (slide, data), (_, parts, _, _) in zip(results, tasks):
+            self.package.write(f"ppt/slides/{slide}.xml", data)
+
+            if self.indexes is not None:
+                self.__index_slide(slide, data=data, start=self.__get_next_shape_id(etree.fromstring(parts[f"ppt/slides/{slide}.xml"])))
+
+    def __add_to_slide(self, node: etree.Element, slide: str = "slide1", children: Optional[Iterable[etree.Element]] = None, boxes: Optional[Boxes] = None) -> None:
+        self.__get_slide(slide)
+        self.__renumber(node, slide=slide)
+        self.dirty.add(f"ppt/slides/{slide}.xml")
+
+        if self.indexes is not None or slide in self.tables:
+            self.__track_shape(node, slide=slide, box=None)
+
+            if children is not None:
+                children = self.__track_children(children, slide=slide, boxes=None if boxes is None else self.bbox.rows(boxes))
+
+        if self.stats is None:
+            self.slides[slide].append(node, children=children)
+            return
+
+        made = [0.0, 0]
+        start = time.perf_counter()
+        self.slides[slide].append(node, children=None if children is None else self.__profile_children(children, slide=slide, made=made))
+        elapsed = time.perf_counter() - start
+
+        self.stats.count(node, slide=slide)
+        if children is not None:
+            self.__record("make", made[0], {"slide": slide, "count": made[1]})
+
+        self.__record("append", elapsed - made[0], {"slide": slide})
+
+    def __add_group_specs(self, box: Tuple[float, float, float, float], specs: Iterable[ShapeSpec], slide: str, boxes: Optional[Boxes] = None) -> None:
+        if self.xml_backend == "lxml" or self.indexes is not None or slide in self.tables or not self.__is_raw_slide(self.__get_slide(slide)):
+            group = self.make_group(*box)
+            self.__add_to_slide(group, slide=slide, children=(self.__make_from_template(*spec) for spec in specs), boxes=boxes)
+            return
+
+        if self.xml_backend == "check":
+            specs = list(specs)
+
+        shape_id = self.shape_id
+        start = time.perf_counter()
+        fragment, kinds = self.__format_group(box, specs=specs)
+        made = time.perf_counter() - start
+
+        if self.xml_backend == "check":
+            self.__check_fragment(fragment, box=box, specs=specs, shape_id=shape_id)
+
+        self.dirty.add(f"ppt/slides/{slide}.xml")
+
+        if self.stats is None:
+            self.slides[slide].append_raw(fragment)
+            return
+
+        start = time.perf_counter()
+        self.slides[slide].append_raw(fragment)
+        elapsed = time.perf_counter() - start
+
+        self.stats.shapes["group"] += 1
+        self.stats.slides[slide] += 1 + len(kinds)
+
+        for kind in kinds:
+            self.stats.shapes[kind] += 1
+
+        self.__record("make", made, {"slide": slide, "count": len(kinds)})
+        self.__record("append", elapsed, {"slide": slide})
+
+    def __is_raw_slide(self, slide: Union[Slide, SlideStream]) -> bool:
+        return all(slide.nsmap.get(prefix) == self.namespaces[prefix] for prefix in ("p", "a"))
+
+    def __format_group(self, box: Tuple[float, float, float, float], specs: Iterable[ShapeSpec]) -> Tuple[bytes, List[str]]:
+        x, y, cx, cy = (self.__get_coordinate(value) for value in box)
+        parts = [self.raw_templates.get(("group", None), self.__compile_raw_group).format(id=self.shape_id, x=x, y=y, cx=cx, cy=cy)]
+        kinds = []
+        self.shape_id += 1
+
+        for kind, style, attrib, x, y, cx, cy, adj in specs:
+            template = self.raw_templates.get((kind, style), partial(self.__compile_raw_template, kind, style))
+            parts.append(template.format(id=self.shape_id, x=x, y=y, cx=cx, cy=cy, adj=adj, **attrib))
+            kinds.append(kind)
+            self.shape_id += 1
+
+        parts.append("</p:grpSp>")
+        return "".join(parts).encode(), kinds
+
+    def __check_fragment(self, fragment: bytes, box: Tuple[float, float, float, float], specs: List[ShapeSpec], shape_id: int) -> None:
+        end_id, self.shape_id = self.shape_id, shape_id
+        group = self.make_group(*box)
+        group.extend(self.__make_from_template(*spec) for spec in specs)
+        self.shape_id = end_id
+
+        namespaces = " ".join(f'xmlns:{prefix}="{namespace}"' for prefix, namespace in self.namespaces.items())
+        raw_group = etree.fromstring(f"<fragment {namespaces}>".encode() + fragment + b"</fragment>")[0]
+
+        if etree.tostring(raw_group, method="c14n", exclusive=True) != etree.tostring(group, method="c14n", exclusive=True):
+            raise RuntimeError(f"Raw XML of group {shape_id} differs from the lxml output")
+
+    def __get_slide(self, slide: str) -> Union[Slide, SlideStream]:
+        if slide in self.slides:
+            self.slides.move_to_end(slide)
+            return self.slides[slide]
+
+        with self.__profile("parse", slide=slide):
+            tree = self.package.parse(f"ppt/slides/{slide}.xml")
+            sp_tree = tree.getroot().find("p:cSld", self.namespaces).find("p:spTree", self.namespaces)
+
+        self.first_ids[slide] = self.__get_next_shape_id(tree.getroot())
+        self.shape_id = max(self.shape_id, self.first_ids[slide])
+
+        if self.streaming:
+            self.slides[slide] = SlideStream(tree=tree, sp_tree=sp_tree, spool_size=self.spool_size)
+        else:
+            self.slides[slide] = Slide(tree=tree, sp_tree=sp_tree)
+            self.__evict_slides(keep=slide)
+
+        return self.slides[slide]
+
+    def __get_table(self, slide: str) -> ShapeTable:
+        if slide in self.tables:
+            self.__get_slide(slide)
+            return self.tables[slide]
+
+        current = self.__get_slide(slide)
+        if not isinstance(current, Slide):
+            raise ValueError("Shapes can't be read or edited in streaming mode")
+
+        current.parse_fragments()
+        self.tables[slide] = ShapeTable()
+        self.__scan_shapes(current.sp_tree, slide=slide, transform=(1, 0, 1, 0))
+        return self.tables[slide]
+
+    def __scan_shapes(self, node: etree.Element, slide: str, transform: Tuple[float, float, float, float]) -> None:
+        tags = {self.__tag(tag) for tag in ("p:sp", "p:cxnSp", "p:pic", "p:graphicFrame", "p:grpSp", "p:contentPart")}
+
+        for child in node:
+            if child.tag not in tags:
+                continue
+
+            self.__track_shape(child, slide=slide, box=None, transform=transform)
+
+            if child.tag == self.__tag("p:grpSp"):
+                self.__scan_shapes(child, slide=slide, transform=self.__get_group_transform(child, transform))
+
+    def __get_group_transform(self, node: etree.Element, transform: Tuple[float, float, float, float]) -> Tuple[float, float, float, float]:
+        xfrm = self.__get_xfrm(node)
+        if xfrm is None:
+            return transform
+
+        values = {}
+        for tag, keys in (("a:off", ("x", "y")), ("a:ext", ("cx", "cy")), ("a:chOff", ("x", "y")), ("a:chExt", ("cx", "cy"))):
+            element = xfrm.find(tag, self.namespaces)
+            values[tag] = [int(element.get(key)) / 360000 for key in keys] if element is not None else None
+
+        if values["a:off"] is None or values["a:ext"] is None or values["a:chOff"] is None or values["a:chExt"] is None:
+            return transform
+
+        (x, y), (w, h), (child_x, child_y), (child_w, child_h) = values["a:off"], values["a:ext"], values["a:chOff"], values["a:chExt"]
+        scale_x, scale_y = w / child_w if child_w else 1, h / child_h if child_h else 1
+        parent_scale_x, parent_x, parent_scale_y, parent_y = transform
+        return parent_scale_x * scale_x, parent_scale_x * (x - child_x * scale_x) + parent_x, parent_scale_y * scale_y, parent_scale_y * (y - child_y * scale_y) + parent_y
+
+    def __get_shape_info(self, table: ShapeTable, shape_id: int) -> dict:
+        node = table.nodes[shape_id]
+        info = {"id": shape_id, "name": node[0][0].get("name", ""), "type": etree.QName(node).localname}
+
+        if shape_id in table.boxes:
+            x0, y0, x1, y1 = table.boxes[shape_id]
+            info.update({"x": x0, "y": y0, "w": x1 - x0, "h": y1 - y0})
+
+        return info
+
+    def __update_geometry(self, node: etree.Element, changes: dict, transform: Tuple[float, float, float, float]) -> None:
+        xfrm = self.__get_xfrm(node)
+        if xfrm is None or xfrm.find("a:off", self.namespaces) is None or xfrm.find("a:ext", self.namespaces) is None:
+            raise ValueError(f'Shape "{node[0][0].get("name", "")}" has no own position')
+
+        offset, extent = xfrm.find("a:off", self.namespaces), xfrm.find("a:ext", self.namespaces)
+        scale_x, shift_x, scale_y, shift_y = transform
+
+        if any(key in changes for key in ("x1", "y1", "x2", "y2")):
+            x, y = int(offset.get("x")) / 360000 * scale_x + shift_x, int(offset.get("y")) / 360000 * scale_y + shift_y
+            w, h = int(extent.get("cx")) / 360000 * scale_x, int(extent.get("cy")) / 360000 * scale_y
+            x1, x2 = (x + w, x) if xfrm.get("flipH") == "1" else (x, x + w)
+            y1, y2 = (y + h, y) if xfrm.get("flipV") == "1" else (y, y + h)
+
+            x1, y1, x2, y2 = changes.get("x1", x1), changes.get("y1", y1), changes.get("x2", x2), changes.get("y2", y2)
+            changes = {**changes, "x": min(x1, x2), "y": min(y1, y2), "w": abs(x2 - x1), "h": abs(y2 - y1)}
+            xfrm.set("flipH", "1" if x1 > x2 else "0")
+            xfrm.set("flipV", "1" if y1 > y2 else "0")
+
+        if "x" in changes:
+            offset.set("x", self.__get_coordinate((changes["x"] - shift_x) / scale_x))
+
+        if "y" in changes:
+            offset.set("y", self.__get_coordinate((changes["y"] - shift_y) / scale_y))
+
+        if "w" in changes:
+            extent.set("cx", self.__get_coordinate(changes["w"] / scale_x))
+
+        if "h" in changes:
+            extent.set("cy", self.__get_coordinate(changes["h"] / scale_y))
+
+        if "rotate" in changes:
+            xfrm.set("rot", self.__get_angle(changes["rotate"]))
+
+    def __update_style(self, node: etree.Element, changes: dict) -> None:
+        sppr = node.find("p:spPr", self.namespaces)
+        if sppr is None:
+            raise ValueError(f'Shape "{node[0][0].get("name", "")}" has no own style')
+
+        style = Style.from_config(changes)
+        fill, ln = self.style_nodes.get(style, lambda: self.__compile_style(style))
+        fill_tags = {self.__tag(tag) for tag in ("a:noFill", "a:solidFill", "a:gradFill", "a:blipFill", "a:pattFill", "a:grpFill")}
+        geometry_tags = {self.__tag(tag) for tag in ("a:xfrm", "a:custGeom", "a:prstGeom")}
+
+        if "fill" in changes:
+            for child in sppr.findall("*"):
+                if child.tag in fill_tags:
+                    sppr.remove(child)
+
+            position = max((i + 1 for i, child in enumerate(sppr) if child.tag in geometry_tags), default=0)
+            sppr.insert(position, fill.__copy__() if fill is not None else self.__element("a:noFill"))
+
+        old_ln = sppr.find("a:ln", self.namespaces)
+
+        if "stroke" in changes:
+            new_ln = ln.__copy__() if ln is not None else self.__element("a:ln")
+            if ln is None:
+                self.__element("a:noFill", parent=new_ln)
+
+            if old_ln is not None:
+                sppr.replace(old_ln, new_ln)
+            else:
+                sppr.insert(max((i + 1 for i, child in enumerate(sppr) if child.tag in geometry_tags or child.tag in fill_tags), default=0), new_ln)
+        elif "thickness" in changes and old_ln is not None:
+            old_ln.set("w", self.__get_size(changes["thickness"]))
+
+    def __renumber(self, node: etree.Element, slide: str) -> etree.Element:
+        for c_nv_pr in node.iter(self.__tag("p:cNvPr")):
+            if int(c_nv_pr.get("id")) < self.first_ids[slide]:
+                c_nv_pr.set("id", str(self.shape_id))
+                c_nv_pr.set("name", f"{c_nv_pr.get('name', '').rsplit(' ', 1)[0]} {self.shape_id}")
+                self.shape_id += 1
+
+        return node
+
+    def __evict_slides(self, keep: str) -> None:
+        if self.max_slides is None:
+            return
+
+        cached = [name for name, slide in self.slides.items() if isinstance(slide, Slide) and name != keep]
+
+        for name in cached[:max(0, len(cached) + 1 - self.max_slides)]:
+            slide, part = self.slides.pop(name), f"ppt/slides/{name}.xml"
+            self.tables.pop(name, None)
+
+            if part in self.dirty:
+                with self.__profile("evict", slide=name):
+                    self.package.write(part, slide.close(), compresslevel=self.compresslevel)
+
+                self.dirty.discard(part)
+
+    def __track_children(self, children: Iterable[etree.Element], slide: str, boxes: Optional[List[tuple]]) -> Generator[etree.Element, None, None]:
+        boxes = iter(boxes) if boxes is not None else None
+
+        for child in children:
+            self.__track_shape(child, slide=slide, box=None if boxes is None else next(boxes))
+            yield child
+
+    def __track_shape(
+        self,
+        node: etree.Element,
+        slide: str,
+        box: Optional[Tuple[float, float, float, float]],
+        transform: Tuple[float, float, float, float] = (1, 0, 1, 0)
+    ) -> None:
+        if box is None:
+            box = self.__get_node_box(node, transform=transform)
+
+        if slide in self.tables:
+            self.tables[slide].add(node, box=box, transform=transform)
+
+        if self.indexes is not None and box is not None and node.tag != self.__tag("p:grpSp"):
+            self.index(slide).insert(int(node[0][0].get("id")), box)
+
+    def __index_slide(self, slide: str, data: bytes, start: int) -> None:
+        for node in etree.fromstring(data).iter(self.__tag("p:sp"), self.__tag("p:cxnSp"), self.__tag("p:pic")):
+            if int(node[0][0].get("id")) >= start:
+                self.__track_shape(node, slide=slide, box=None)
+
+    def __get_next_shape_id(self, root: etree.Element) -> int:
+        return max((int(node.get("id")) for node in root.iter(self.__tag("p:cNvPr")) if node.get("id", "").isdigit()), default=0) + 1
+
+    def __get_xfrm(self, node: etree.Element) -> Optional[etree.Element]:
+        for path in ("p:spPr/a:xfrm", "p:grpSpPr/a:xfrm", "p:xfrm"):
+            xfrm = node.find(path, self.namespaces)
+
+            if xfrm is not None:
+                return xfrm
+
+        return None
+
+    def __get_node_box(self, node: etree.Element, transform: Tuple[float, float, float, float] = (1, 0, 1, 0)) -> Optional[Tuple[float, float, float, float]]:
+        xfrm = self.__get_xfrm(node)
+        if xfrm is None or xfrm.find("a:off", self.namespaces) is None or xfrm.find("a:ext", self.namespaces) is None:
+            return None
+
+        offset, extent = xfrm.find("a:off", self.namespaces), xfrm.find("a:ext", self.namespaces)
+        scale_x, shift_x, scale_y, shift_y = transform
+        x, y = int(offset.get("x")) / 360000 * scale_x + shift_x, int(offset.get("y")) / 360000 * scale_y + shift_y
+        w, h = int(extent.get("cx")) / 360000 * scale_x, int(extent.get("cy")) / 360000 * scale_y
+        return self.bbox.rows(self.bbox.rectangles(x=[x], y=[y], w=[w], h=[h], rotate=[int(xfrm.get("rot", 0)) / 60000]))[0]
+
+    def __profile_children(self, children: Iterable[etree.Element], slide: str, made: list) -> Generator[etree.Element, None, None]:
+        children = iter(children)
+
+        while True:
+            start = time.perf_counter()
+            child = next(children, None)
+            made[0] += time.perf_counter() - start
+
+            if child is None:
+                return
+
+            made[1] += 1
+            self.stats.count(child, slide=slide)
+            yield child
+
+    def __profile(self, phase: str, **info: object) -> ContextManager:
+        if self.stats is None:
+            return nullcontext()
+
+        return self.__measure(phase, info)
+
+    @contextmanager
+    def __measure(self, phase: str, info: dict) -> Generator[None, None, None]:
+        start = time.perf_counter()
+        yield
+        self.__record(phase, time.perf_counter() - start, info)
+
+    def __record(self, phase: str, seconds: float, info: dict) -> None:
+        self.stats.record(phase, seconds)
+
+        for hook in self.hooks:
+            hook(phase, seconds, info)
+
+    def __decimate_ellipses(self, ellipses: List[Ellipse], resolution: float) -> List[Ellipse]:
+        with self.__profile("decimate"):
+            decimator = Decimator(*self.__get_slide_size(), resolution=resolution)
+            covers, extents, opaque = [], [], []
+
+            for ellipse in ellipses:
+                rx, ry = ellipse.dx / 2, ellipse.dy / 2
+                cx, cy = ellipse.x + rx, ellipse.y + ry
+                style = ellipse.style
+                margin = style.thickness * 2.54 / 144 if style.stroke is not None else 0
+
+                if ellipse.rotate % 180 == 0:
+                    covers.append((cx, cy, rx, ry))
+                    extents.append((cx, cy, rx + margin, ry + margin))
+                else:
+                    covers.append((cx, cy, min(rx, ry), min(rx, ry)))
+                    extents.append((cx, cy, max(rx, ry) + margin, max(rx, ry) + margin))
+
+                opaque.append(style.fill is not None and style.fill_opacity >= 1)
+
+            visible = decimator.ellipses(covers, extents, opaque=opaque)
+            return [ellipse for ellipse, is_visible in zip(ellipses, visible) if is_visible]
+
+    def __decimate_lines(self, lines: List[Line], resolution: float) -> List[Line]:
+        with self.__profile("decimate"):
+            decimated_lines = []
+            start = 0
+
+            for end in range(1, len(lines) + 1):
+                if end < len(lines) and self.__is_continued(lines[end - 1], lines[end]):
+                    continue
+
+                chain = lines[start:end]
+                x, y = [chain[0].x1] + [line.x2 for line in chain], [chain[0].y1] + [line.y2 for line in chain]
+                points = Decimator.polyline(x, y, tolerance=resolution) if len(chain) > 1 else [0, 1]
+                decimated_lines.extend(replace(chain[0], x1=x[i], y1=y[i], x2=x[j], y2=y[j]) for i, j in zip(points, points[1:]))
+                start = end
+
+            return decimated_lines
+
+    def __place_textboxes(
+        self,
+        textboxes: List[TextBox],
+        slide: str,
+        placement: str,
+        offsets: Optional[Sequence[Tuple[float, float]]],
+        drop: bool
+    ) -> Tuple[List[TextBox], int]:
+        if placement not in {"greedy", "anneal"}:
+            raise ValueError(f'Unknown placement "{placement}"')
+
+        with self.__profile("place", slide=slide):
+            obstacles = self.indexes.get(slide) if self.indexes is not None else None
+            placer = LabelPlacer(offsets=offsets, obstacles=obstacles, vectorized=self.bbox.vectorized, min_size=self.bbox.min_size)
+            overlapped = placer.place([(textbox.x, textbox.y, textbox.w, textbox.h) for textbox in textboxes], anneal=placement == "anneal")
+            visible = placer.visible() if drop else [True] * len(textboxes)
+
+            placed = []
+            for i, (textbox, is_visible) in enumerate(zip(textboxes, visible)):
+                if is_visible:
+                    x, y = placer.position(i)
+                    placed.append(replace(textbox, x=x, y=y))
+
+        if drop:
+            return placed, self.__get_removed("textbox", len(textboxes) - len(placed))
+
+        return placed, sum(overlapped)
+
+    def __view_shapes(self, shapes: List[Union[Line, Ellipse, Rectangle]], viewport: Viewport) -> List[Union[Line, Ellipse, Rectangle]]:
+        fields = {"line": ("x1", "y1", "x2", "y2"), "ellipse": ("x", "y", "dx", "dy"), "rectangle": ("x", "y", "w", "h")}[shapes[0].kind]
+        columns = Columns({name: [getattr(shape, name) for shape in shapes] for name in fields}, vectorized=self.bbox.vectorized)
+        values = [columns.numbers(name) for name in fields]
+
+        if shapes[0].kind == "line":
+            values = [*viewport.points(values[0], values[1]), *viewport.points(values[2], values[3])]
+        elif shapes[0].kind == "ellipse":
+            values = [*viewport.ellipses(*values), values[2], values[3]]
+        else:
+            values = list(viewport.rectangles(*values))
+
+        values = [value.tolist() if np is not None and isinstance(value, np.ndarray) else value for value in values]
+        return [replace(shape, **dict(zip(fields, row))) for shape, row in zip(shapes, zip(*values))]
+
+    def __view_paths(self, paths: List[Union[Polygon, Polyline]], viewport: Viewport) -> List[Union[Polygon, Polyline]]:
+        if self.bbox.vectorized:
+            x, y = viewport.points(np.concatenate([np.asarray(path.x) for path in paths]), np.concatenate([np.asarray(path.y) for path in paths]))
+        else:
+            x, y = viewport.points([value for path in paths for value in path.x], [value for path in paths for value in path.y])
+
+        ends = list(accumulate(len(path.x) for path in paths))
+        return [replace(path, x=x[end - len(path.x):end], y=y[end - len(path.y):end]) for path, end in zip(paths, ends)]
+
+    def __is_continued(self, line: Line, next_line: Line) -> bool:
+        return line.x2 == next_line.x1 and line.y2 == next_line.y1 and line.style == next_line.style
+
+    def __get_removed(self, kind: str, removed: int) -> int:
+        if self.stats is not None and removed:
+            self.stats.removed[kind] += removed
+
+        return removed
+
+    def __get_slide_size(self) -> Tuple[float, float]:
+        if self.slide_size is None:
+            name = "ppt/presentation.xml"
+            root = self.parts[name].getroot() if name in self.parts else self.package.parse(name).getroot()
+            size = root.find("p:sldSz", self.namespaces)
+            self.slide_size = int(size.get("cx")) / 360000, int(size.get("cy")) / 360000
+
+        return self.slide_size
+
+    def __get_part(self, name: str) -> etree.ElementTree:
+        if name not in self.parts:
+            self.parts[name] = self.package.parse(name)
+
+        return self.parts[name]
+
+    def __get_slide_list(self, presentation: etree.Element) -> etree.Element:
+        slide_list = presentation.find("p:sldIdLst", self.namespaces)
+        if slide_list is not None:
+            return slide_list
+
+        index = 0
+        for i, node in enumerate(presentation):
+            if node.tag in {self.__tag("p:sldMasterIdLst"), self.__tag("p:notesMasterIdLst"), self.__tag("p:handoutMasterIdLst")}:
+                index = i + 1
+
+        slide_list = self.__element("p:sldIdLst")
+        presentation.insert(index, slide_list)
+        return slide_list
+
+    def __get_default_layout(self, presentation: etree.Element, relationships: etree.Element) -> str:
+        slide_list = presentation.find("p:sldIdLst", self.namespaces)
+        targets = {node.get("Id"): node.get("Target") for node in relationships}
+
+        if slide_list is not None and len(slide_list):
+            target = targets[slide_list[-1].get(self.__tag("r:id"))]
+            slide_relationships = self.__get_part(f"ppt/slides/_rels/{os.path.basename(target)}.rels").getroot()
+
+            for node in slide_relationships:
+                if node.get("Type") == self.relationship_types["slideLayout"]:
+                    return os.path.splitext(os.path.basename(node.get("Target")))[0]
+
+        return "slideLayout1"
+
+    def __make_slide(self) -> bytes:
+        slide_node = self.__element("p:sld")
+        sp_tree = self.__element("p:spTree", parent=self.__element("p:cSld", parent=slide_node))
+
+        nv_grp_sp_pr = self.__element("p:nvGrpSpPr", parent=sp_tree)
+        self.__element("p:cNvPr", {"id": "1", "name": ""}, parent=nv_grp_sp_pr)
+        self.__element("p:cNvGrpSpPr", parent=nv_grp_sp_pr)
+        self.__element("p:nvPr", parent=nv_grp_sp_pr)
+
+        xfrm = self.__element("a:xfrm", parent=self.__element("p:grpSpPr", parent=sp_tree))
+        self.__element("a:off", {"x": "0", "y": "0"}, parent=xfrm)
+        self.__element("a:ext", {"cx": "0", "cy": "0"}, parent=xfrm)
+        self.__element("a:chOff", {"x": "0", "y": "0"}, parent=xfrm)
+        self.__element("a:chExt", {"cx": "0", "cy": "0"}, parent=xfrm)
+
+        self.__element("a:masterClrMapping", parent=self.__element("p:clrMapOvr", parent=slide_node))
+        return etree.tostring(slide_node, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+    def __make_relationships(self, relationships: List[Tuple[str, str, str]]) -> bytes:
+        namespace = self.package_namespaces["rel"]
+        relationships_node = etree.Element(f"{{{namespace}}}Relationships", nsmap={None: namespace})
+
+        for relationship_id, relationship_type, target in relationships:
+            etree.SubElement(relationships_node, f"{{{namespace}}}Relationship", Id=relationship_id, Type=self.relationship_types[relationship_type], Target=target)
+
+        return etree.tostring(relationships_node, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+    def __tag(self, tag: str) -> str:
+        if tag not in self.tags:
+            namespace, tag_name = tag.split(":")
+            self.tags[tag] = etree.QName(self.namespaces[namespace], tag_name).text
+
+        return self.tags[tag]
+
+    def __element(self, tag: str, attrib: Optional[dict] = None, parent: Optional[etree.Element] = None) -> etree.Element:
+        if attrib is None:
+            attrib = {}
+
+        if parent is not None:
+            return etree.SubElement(parent, self.__tag(tag), attrib=attrib)
+
+        return etree.Element(self.__tag(tag), attrib=attrib, nsmap=self.namespaces)
+
+    def __get_record_spec(self, shape: Union[Line, Ellipse, Rectangle]) -> ShapeSpec:
+        if shape.kind == "line":
+            x1, y1, x2, y2 = shape.x1, shape.y1, shape.x2, shape.y2
+            coordinates = self.__get_coordinate(min(x1, x2)), self.__get_coordinate(min(y1, y2)), self.__get_coordinate(abs(x2 - x1)), self.__get_coordinate(abs(y2 - y1))
+            return self.__get_line_spec(*coordinates, flip_h=x1 > x2, flip_v=y1 > y2, style=shape.style)
+
+        if shape.kind == "ellipse":
+            coordinates = self.__get_coordinate(shape.x), self.__get_coordinate(shape.y), self.__get_coordinate(shape.dx), self.__get_coordinate(shape.dy)
+            return self.__get_ellipse_spec(*coordinates, rot=self.__get_angle(shape.rotate), style=shape.style)
+
+        coordinates = self.__get_coordinate(shape.x), self.__get_coordinate(shape.y), self.__get_coordinate(shape.w), self.__get_coordinate(shape.h)
+        return self.__get_rectangle_spec(*coordinates, rot=self.__get_angle(shape.rotate), adj=self.__get_fraction(shape.radius / 2), style=shape.style)
+
+    def __get_line_spec(self, x: str, y: str, cx: str, cy: str, flip_h: bool, flip_v: bool, style: Style) -> ShapeSpec:
+        return "line", style, {"flipH": "1" if flip_h else "0", "flipV": "1" if flip_v else "0"}, x, y, cx, cy, None
+
+    def __get_ellipse_spec(self, x: str, y: str, cx: str, cy: str, rot: str, style: Style) -> ShapeSpec:
+        return "ellipse", style, {"rot": rot}, x, y, cx, cy, None
+
+    def __get_rectangle_spec(self, x: str, y: str, cx: str, cy: str, rot: str, adj: str, style: Style) -> ShapeSpec:
+        return "rectangle", style, {"rot": rot}, x, y, cx, cy, adj
+
+    def __make_group(self, shape_id: str, x: str, y: str, cx: str, cy: str) -> etree.Element:
         group_node = self.__element("p:grpSp")
 
         nvgrpsppr = self.__element("p:nvGrpSpPr", parent=group_node)
-        self.__element("p:cNvPr", {"id": str(self.shape_id), "name": f"Group {self.shape_id}"}, parent=nvgrpsppr)
+        self.__element("p:cNvPr", {"id": shape_id, "name": f"Group {shape_id}"}, parent=nvgrpsppr)
         self.__element("p:cNvGrpSpPr", parent=nvgrpsppr)
         self.__element("p:nvPr", parent=nvgrpsppr)
 
         grpsppr = self.__element("p:grpSpPr", parent=group_node)
         xfrm = self.__element("a:xfrm", parent=grpsppr)
-        self.__element("a:off", {"x": self.__get_coordinate(x), "y": self.__get_coordinate(y)}, parent=xfrm)
-        self.__element("a:ext", {"cx": self.__get_coordinate(width), "cy": self.__get_coordinate(height)}, parent=xfrm)
-        self.__element("a:chOff", {"x": self.__get_coordinate(x), "y": self.__get_coordinate(y)}, parent=xfrm)
-        self.__element("a:chExt", {"cx": self.__get_coordinate(width), "cy": self.__get_coordinate(height)}, parent=xfrm)
-        self.shape_id += 1
+        self.__element("a:off", {"x": x, "y": y}, parent=xfrm)
+        self.__element("a:ext", {"cx": cx, "cy": cy}, parent=xfrm)
+        self.__element("a:chOff", {"x": x, "y": y}, parent=xfrm)
+        self.__element("a:chExt", {"cx": cx, "cy": cy}, parent=xfrm)
 
         return group_node
 
-    def save(self, path: str) -> None:
-        for name, slide in self.slides.items():
-            slide.tree.write(os.path.join(self.work_path, "ppt", "slides", f"{name}.xml"))
+    def __make_polygon(self, polygon: Polygon, box: Tuple[float, float, float, float]) -> etree.Element:
+        x, y, width, height = box[0], box[1], box[2] - box[0], box[3] - box[1]
+        offset_x, offset_y, cx, cy = self.__get_coordinate(x), self.__get_coordinate(y), self.__get_coordinate(width), self.__get_coordinate(height)
+        attrib = {"rot": self.__get_angle(polygon.rotate)}
+        polygon_node = self.__make_from_template("polygon", style=polygon.style, attrib=attrib, x=offset_x, y=offset_y, cx=cx, cy=cy)
 
-        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as f:
-            for root, _, files in os.walk(self.work_path):
-                for file in files:
-                    f.write(os.path.join(root, file), os.path.relpath(os.path.join(root, file), self.work_path))
+        points = [f'<a:pt x="{point_x}" y="{point_y}"/>' for point_x, point_y in zip(self.__get_shifted(polygon.x, x), self.__get_shifted(polygon.y, y))]
+        lines = "".join(f"<a:lnTo>{point}</a:lnTo>" for point in points[1:])
+        path = f'<a:path xmlns:a="{self.namespaces["a"]}" w="{cx}" h="{cy}"><a:moveTo>{points[0]}</a:moveTo>{lines}<a:close/></a:path>'
+        polygon_node[1][1][3].append(etree.fromstring(path))
 
-    def __add_to_slide(self, node: etree.ElementTree, slide: str = "slide1") -> None:
-        if slide not in self.slides:
-            tree = etree.parse(os.path.join(self.work_path, "ppt", "slides", f"{slide}.xml"))
-            sp_tree = tree.getroot().find("p:cSld", self.namespaces).find("p:spTree", self.namespaces)
-            self.slides[slide] = Slide(tree=tree, sp_tree=sp_tree)
+        return polygon_node
 
-        self.slides[slide].sp_tree.append(node)
+    def __make_polyline(self, polyline: Polyline, box: Tuple[float, float, float, float]) -> etree.Element:
+        return self.__make_path("path", style=polyline.style, paths=[[(polyline.x, polyline.y)]], closed=False, boxes=[box], rotate=polyline.rotate)
+
+    def __make_shape(
+        self,
+        shape: Shape,
+        polygon_boxes: Iterator[Tuple[float, float, float, float]],
+        polyline_boxes: Iterator[Tuple[float, float, float, float]]
+    ) -> etree.Element:
+        if shape.kind == "polygon":
+            return self.__make_polygon(shape, box=next(polygon_boxes))
+
+        if shape.kind == "polyline":
+            return self.__make_polyline(shape, box=next(polyline_boxes))
+
+        return self.make_shape(shape=shape)
+
+    def __make_compact_polygons(self, polygons: List[Polygon], boxes: List[Tuple[float, float, float, float]]) -> Generator[etree.Element, None, None]:
+        keys = [polygon.style if polygon.rotate == 0 else None for polygon in polygons]
+
+        for indices in self.__get_compact_groups(keys, boxes=boxes):
+            if len(indices) == 1:
+                yield self.__make_polygon(polygons[indices[0]], box=boxes[indices[0]])
+                continue
+
+            paths = [[(polygons[i].x, polygons[i].y)] for i in indices]
+            yield self.__make_path("polygon", style=keys[indices[0]], paths=paths, closed=True, boxes=[boxes[i] for i in indices])
+
+    def __make_compact_lines(self, lines: List[Line], boxes: List[Tuple[float, float, float, float]]) -> Generator[etree.Element, None, None]:
+        keys = [line.style for line in lines]
+
+        for indices in self.__get_compact_groups(keys, boxes=boxes):
+            if len(indices) == 1:
+                yield self.make_line(lines[indices[0]])
+                continue
+
+            paths = [[([lines[i].x1, lines[i].x2], [lines[i].y1, lines[i].y2]) for i in indices]]
+            yield self.__make_path("path", style=keys[indices[0]], paths=paths, closed=False, boxes=[boxes[i] for i in indices])
+
+    def __get_compact_groups(self, keys: List[Optional[Style]], boxes: List[Tuple[float, float, float, float]]) -> List[List[int]]:
+        sizes = [max(x1 - x0, y1 - y0) for x0, y0, x1, y1 in boxes]
+        cell = sum(sizes) / len(sizes) or 1
+        cells = defaultdict(list)
+        groups, last_groups = [], {}
+
+        for i, (key, box) in enumerate(zip(keys, boxes)):
+            columns, rows = range(math.floor(box[0] / cell), math.floor(box[2] / cell) + 1), range(math.floor(box[1] / cell), math.floor(box[3] / cell) + 1)
+            box_cells = [(column, row) for column in columns for row in rows]
+            group = last_groups.get(key) if key is not None else None
+
+            if group is not None and any(other_group > group and self.__is_overlapped(box, other_box) for box_cell in box_cells for other_group, other_box in cells[box_cell]):
+                group = None
+
+            if group is None:
+                group = len(groups)
+                groups.append([])
+                last_groups[key] = group
+
+            groups[group].append(i)
+            for box_cell in box_cells:
+                cells[box_cell].append((group, box))
+
+        return groups
+
+    def __is_overlapped(self, box: Tuple[float, float, float, float], other_box: Tuple[float, float, float, float]) -> bool:
+        epsilon = 0.5 / 360000
+        return box[0] < other_box[2] - epsilon and other_box[0] < box[2] - epsilon and box[1] < other_box[3] - epsilon and other_box[1] < box[3] - epsilon
+
+    def __make_path(
+        self,
+        kind: str,
+        style: Style,
+        paths: List[List[Tuple[Values, Values]]],
+        closed: bool,
+        boxes: List[Tuple[float, float, float, float]],
+        rotate: float = 0
+    ) -> etree.Element:
+        x, y = min(box[0] for box in boxes), min(box[1] for box in boxes)
+        width, height = max(box[2] for box in boxes) - x, max(box[3] for box in boxes) - y
+        offset_x, offset_y, cx, cy = self.__get_coordinate(x), self.__get_coordinate(y), self.__get_coordinate(width), self.__get_coordinate(height)
+        node = self.__make_from_template(kind, style=style, attrib={"rot": self.__get_angle(rotate)}, x=offset_x, y=offset_y, cx=cx, cy=cy)
+
+        path_attributes = f'w="{max(1, int(cx))}" h="{max(1, int(cy))}"' + ("" if closed else ' fill="none"')
+        path_nodes = []
+
+        for subpaths in paths:
+            segments = []
+
+            for xs, ys in subpaths:
+                points = zip(self.__get_shifted(xs, x), self.__get_shifted(ys, y))
+                start_x, start_y = next(points)
+                segments.append(f'<a:moveTo><a:pt x="{start_x}" y="{start_y}"/></a:moveTo>')
+                segments.extend([f'<a:lnTo><a:pt x="{point_x}" y="{point_y}"/></a:lnTo>' for point_x, point_y in points])
+
+                if closed:
+                    segments.append("<a:close/>")
+
+            path_nodes.append(f'<a:path {path_attributes}>{"".join(segments)}</a:path>')
+
+        cust_geom = node[1][1]
+        cust_geom.replace(cust_geom[3], etree.fromstring(f'<a:pathLst xmlns:a="{self.namespaces["a"]}">{"".join(path_nodes)}</a:pathLst>'))
+        return node
+
+    def __get_shifted(self, values: Values, offset: float) -> List[str]:
+        if np is not None and isinstance(values, np.ndarray):
+            return self.__get_coordinates(values.astype(float) - offset)
+
+        offset = float(offset)
+        return self.__get_coordinates([value - offset for value in values])
 
-    def __element(self, tag: str, attrib: Optional[dict] = None, parent: Optional[etree.Element] = None) -> etree.Element:
-        namespace, tag_name = tag.split(":")
+    def __make_from_template(self, kind: str, style: Style, attrib: dict, x: str, y: str, cx: str, cy: str, adj: Optional[str] = None) -> etree.Element:
+        node = self.templates.get((kind, style), lambda: self.__compile_template(kind, style=style)).__copy__()
+        c_nv_pr, xfrm = node[0][0], node[1][0]
+        c_nv_pr.set("id", str(self.shape_id))
+        c_nv_pr.set("name", f"{self.template_names[kind]} {self.shape_id}")
+
+        for name, value in attrib.items():
+            xfrm.set(name, value)
+
+        off, ext = xfrm
+        off.set("x", x)
+        off.set("y", y)
+        ext.set("cx", cx)
+        ext.set("cy", cy)
+
+        if adj is not None:
+            node[1][1][0][0].set("fmla", f"val {adj}")
 
-        if attrib is None:
-            attrib = {}
+        self.shape_id += 1
 
-        if parent is not None:
-            return etree.SubElement(parent, etree.QName(self.namespaces[namespace], tag_name), attrib=attrib)
+        return node
 
-        return etree.Element(etree.QName(self.namespaces[namespace], tag_name), attrib=attrib)
+    def __compile_raw_template(self, kind: str, style: Style) -> str:
+        node = self.templates.get((kind, style), lambda: self.__compile_template(kind, style=style)).__copy__()
+        c_nv_pr, xfrm = node[0][0], node[1][0]
+        c_nv_pr.set("id", "__id__")
+        c_nv_pr.set("name", f"{self.template_names[kind]} __id__")
 
-    def __set_fill(self, node: etree.Element, config: dict) -> None:
-        if "fill" not in config:
-            return
+        for name in xfrm.attrib:
+            xfrm.set(name, f"__{name}__")
 
-        fill = self.__element("a:srgbClr", {"val": self.__get_color(config["fill"])}, parent=self.__element("a:solidFill", parent=node))
-        opacity = config.get("fill-opacity", config.get("opacity", 1))
+        off, ext = xfrm
+        off.set("x", "__x__")
+        off.set("y", "__y__")
+        ext.set("cx", "__cx__")
+        ext.set("cy", "__cy__")
 
-        if opacity < 1:
-            self.__element("a:alpha", {"val": self.__get_fraction(opacity)}, parent=fill)
+        if kind == "rectangle":
+            node[1][1][0][0].set("fmla", "val __adj__")
 
-    def __set_stroke(self, node: etree.Element, config: dict) -> None:
-        if not config.get("stroke"):
-            return
+        return self.__compile_raw(node)
 
-        ln = self.__element("a:ln", {"w": self.__get_size(config.get("thickness", 1))}, parent=node)
-        fill = self.__element("a:srgbClr", {"val": self.__get_color(config["stroke"])}, parent=self.__element("a:solidFill", parent=ln))
+    def __compile_raw_group(self) -> str:
+        return self.__compile_raw(self.__make_group("__id__", x="__x__", y="__y__", cx="__cx__", cy="__cy__")).removesuffix("</p:grpSp>")
 
-        if config.get("stroke-dash", "solid") != "solid":
-            self.__element("a:prstDash", {"val": self.__get_stroke_dash(config["stroke-dash"])}, parent=ln)
+    def __compile_raw(self, node: etree.Element) -> str:
+        xml = re.sub(r' xmlns(:\w+)?="[^"]*"', "", etree.tostring(node, encoding="unicode"))
+        return re.sub(r"__(\w+)__", r"{\1}", xml.replace("{", "{{").replace("}", "}}"))
 
-        opacity = config.get("stroke-opacity", config.get("opacity", 1))
-        if opacity < 1:
-            self.__element("a:alpha", {"val": self.__get_fraction(opacity)}, parent=fill)
+    def __compile_template(self, kind: str, style: Style) -> etree.Element:
+        shape_tag, nv_tag, c_nv_tag = ("p:cxnSp", "p:nvCxnSpPr", "p:cNvCxnSpPr") if kind == "line" else ("p:sp", "p:nvSpPr", "p:cNvSpPr")
+        node = self.__element(shape_tag)
 
-    def __set_xfrm(self, sppr: etree.Element, attrib: dict, x: float, y: float, cx: float, cy: float) -> etree.Element:
-        xfrm = self.__element("a:xfrm", attrib, parent=sppr)
-        self.__element("a:off", {"x": self.__get_coordinate(x), "y": self.__get_coordinate(y)}, parent=xfrm)
-        self.__element("a:ext", {"cx": self.__get_coordinate(cx), "cy": self.__get_coordinate(cy)}, parent=xfrm)
-        return xfrm
+        nvsppr = self.__element(nv_tag, parent=node)
+        self.__element("p:cNvPr", {"id": "", "name": ""}, parent=nvsppr)
+        self.__element(c_nv_tag, parent=nvsppr)
+        self.__element("p:nvPr", parent=nvsppr)
 
-    def __get_lines_bbox(self, lines: List[dict]) -> Tuple[float, float, float, float]:
-        x1, y1, x2, y2 = lines[0]["x1"], lines[0]["y1"], lines[0]["x2"], lines[0]["y2"]
-        x_min, x_max = min(x1, x2), max(x1, x2)
-        y_min, y_max = min(y1, y2), max(y1, y2)
+        sppr = self.__element("p:spPr", parent=node)
+        self.__set_xfrm(sppr, {"flipH": "0", "flipV": "0"} if kind == "line" else {"rot": "0"}, x="0", y="0", cx="0", cy="0")
 
-        for line in lines:
-            x1, y1, x2, y2 = line["x1"], line["y1"], line["x2"], line["y2"]
-            x_min, y_min = min(x_min, x1, x2), min(y_min, y1, y2)
-            x_max, y_max = max(x_max, x1, x2), max(y_max, y1, y2)
+        if kind in {"polygon", "path"}:
+            cust_geom = self.__element("a:custGeom", parent=sppr)
+            self.__element("a:avLst", parent=cust_geom)
+            self.__element("a:ahLst", parent=cust_geom)
+            self.__element("a:rect", {"b": "b", "l": "l", "r": "r", "t": "t"}, parent=cust_geom)
+            self.__element("a:pathLst", parent=cust_geom)
+        else:
+            geom = self.__element("a:prstGeom", {"prst": {"line": "line", "ellipse": "ellipse", "rectangle": "roundRect"}[kind]}, parent=sppr)
+            avlst = self.__element("a:avLst", parent=geom)
 
-        return x_min, y_min, x_max - x_min, y_max - y_min
+            if kind == "rectangle":
+                self.__element("a:gd", {"name": "adj", "fmla": "val 0"}, parent=avlst)
 
-    def __get_ellipses_bbox(self, ellipses: List[dict]) -> Tuple[float, float, float, float]:
-        x_min = x_max = ellipses[0]["x"]
-        y_min = y_max = ellipses[0]["y"]
+        if kind != "line":
+            self.__set_fill(sppr, style=style)
 
-        for ellipse in ellipses:
-            dx, dy = self.__get_diameter(ellipse, key="dx"), self.__get_diameter(ellipse, key="dy")
-            angle = ellipse.get("rotate", 0)
+        self.__set_stroke(sppr, style=style)
+        return node
 
-            if angle == 0:
-                x1, y1, x2, y2 = ellipse["x"], ellipse["y"], ellipse["x"] + dx, ellipse["y"] + dy
-            else:
-                cx, cy = ellipse["x"] + dx / 2, ellipse["y"] + dy / 2
-                r = angle / 180 * math.pi
-                t1 = math.atan(-dy / dx * math.tan(r))
-                t2 = math.atan(dy / dx / math.tan(r))
-                w = dx * math.cos(t1) * math.cos(r) - dy * math.sin(t1) * math.sin(r)
-                h = -dy * math.sin(t2) * math.cos(r) - dx * math.cos(t2) * math.sin(r)
-                x1, y1, x2, y2 = cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2
+    def __set_fill(self, node: etree.Element, style: Style) -> None:
+        fill, _ = self.style_nodes.get(style, lambda: self.__compile_style(style))
 
-            x_min, y_min = min(x_min, x1), min(y_min, y1)
-            x_max, y_max = max(x_max, x2), max(y_max, y2)
+        if fill is not None:
+            node.append(fill.__copy__())
 
-        return x_min, y_min, x_max - x_min, y_max - y_min
+    def __set_stroke(self, node: etree.Element, style: Style) -> None:
+        _, ln = self.style_nodes.get(style, lambda: self.__compile_style(style))
 
-    def __get_rectangles_bbox(self, rectangles: List[dict]) -> Tuple[float, float, float, float]:
-        polygons = []
+        if ln is not None:
+            node.append(ln.__copy__())
 
-        for rectangle in rectangles:
-            x, y, w, h = rectangle["x"], rectangle["y"], rectangle["w"], rectangle["h"]
+    def __compile_style(self, style: Style) -> Tuple[Optional[etree.Element], Optional[etree.Element]]:
+        fill, ln = None, None
 
-            polygons.append({
-                "points": [{"x": x, "y": y}, {"x": x, "y": y + h}, {"x": x + w, "y": y}, {"x": x + w, "y": y + h}],
-                "rotate": rectangle.get("rotate", 0)
-            })
+        if style.fill is not None:
+            fill = self.__element("a:solidFill")
+            color = self.__element("a:srgbClr", {"val": self.__get_color(style.fill)}, parent=fill)
 
-        return self.__get_polygons_bbox(polygons=polygons)
+            if style.fill_opacity < 1:
+                self.__element("a:alpha", {"val": self.__get_fraction(style.fill_opacity)}, parent=color)
 
-    def __get_polygons_bbox(self, polygons: List[dict]) -> Tuple[float, float, float, float]:
-        x_min = x_max = polygons[0]["points"][0]["x"]
-        y_min = y_max = polygons[0]["points"][0]["y"]
+        if style.stroke is not None:
+            ln = self.__element("a:ln", {"w": self.__get_size(style.thickness)})
+            color = self.__element("a:srgbClr", {"val": self.__get_color(style.stroke)}, parent=self.__element("a:solidFill", parent=ln))
 
-        for polygon in polygons:
-            angle = polygon.get("rotate", 0) / 180 * math.pi
-            cx = sum(point["x"] for point in polygon["points"]) / len(polygon["points"])
-            cy = sum(point["y"] for point in polygon["points"]) / len(polygon["points"])
+            if style.stroke_dash != "solid":
+                self.__element("a:prstDash", {"val": self.__get_stroke_dash(style.stroke_dash)}, parent=ln)
 
-            for point in polygon["points"]:
-                dx, dy = point["x"] - cx, point["y"] - cy
-                x = cx + dx * math.cos(angle) - dy * math.sin(angle)
-                y = cy + dx * math.sin(angle) + dy * math.cos(angle)
+            if style.stroke_opacity < 1:
+                self.__element("a:alpha", {"val": self.__get_fraction(style.stroke_opacity)}, parent=color)
 
-                x_min, y_min = min(x_min, x), min(y_min, y)
-                x_max, y_max = max(x_max, x), max(y_max, y)
+        return fill, ln
 
-        return x_min, y_min, x_max - x_min, y_max - y_min
+    def __set_xfrm(self, sppr: etree.Element, attrib: dict, x: str, y: str, cx: str, cy: str) -> etree.Element:
+        xfrm = self.__element("a:xfrm", attrib, parent=sppr)
+        self.__element("a:off", {"x": x, "y": y}, parent=xfrm)
+        self.__element("a:ext", {"cx": cx, "cy": cy}, parent=xfrm)
+        return xfrm
+
+    def __get_lines_boxes(self, lines: List[Line]) -> Boxes:
+        return self.bbox.lines(x1=[line.x1 for line in lines], y1=[line.y1 for line in lines], x2=[line.x2 for line in lines], y2=[line.y2 for line in lines])
+
+    def __get_ellipses_boxes(self, ellipses: List[Ellipse]) -> Boxes:
+        x, y = [ellipse.x for ellipse in ellipses], [ellipse.y for ellipse in ellipses]
+        dx, dy = [ellipse.dx for ellipse in ellipses], [ellipse.dy for ellipse in ellipses]
+        return self.bbox.ellipses(x=x, y=y, dx=dx, dy=dy, rotate=[ellipse.rotate for ellipse in ellipses])
+
+    def __get_rectangles_boxes(self, rectangles: List[Union[Rectangle, TextBox]]) -> Boxes:
+        x, y = [rectangle.x for rectangle in rectangles], [rectangle.y for rectangle in rectangles]
+        w, h = [rectangle.w for rectangle in rectangles], [rectangle.h for rectangle in rectangles]
+        return self.bbox.rectangles(x=x, y=y, w=w, h=h, rotate=[rectangle.rotate for rectangle in rectangles])
+
+    def __get_polygons_boxes(self, polygons: List[Union[Polygon, Polyline]]) -> Boxes:
+        sizes, rotate = [len(polygon.x) for polygon in polygons], [polygon.rotate for polygon in polygons]
 
-    def __get_textboxes_bbox(self, textboxes: List[dict]) -> Tuple[float, float, float, float]:
-        return self.__get_rectangles_bbox(rectangles=textboxes)
+        x, y = self.__concatenate([polygon.x for polygon in polygons]), self.__concatenate([polygon.y for polygon in polygons])
+        return self.bbox.polygons(x=x, y=y, sizes=sizes, rotate=rotate)
 
-    def __get_shapes_bbox(self, shapes: List[dict]) -> Tuple[float, float, float, float]:
-        x_min, y_min, x_max, y_max = None, None, None, None
+    def __concatenate(self, values: List[Values]) -> Values:
+        if np is not None and any(isinstance(points, np.ndarray) for points in values):
+            joined = np.concatenate([np.asarray(points, dtype=float) for points in values])
+            return joined if self.bbox.vectorized and len(joined) >= self.bbox.min_size else joined.tolist()
+
+        if len(values) == 1:
+            return values[0]
+
+        joined = array("d")
+        for points in values:
+            joined.extend(points)
+
+        return joined
+
+    def __get_polylines_boxes(self, polylines: List[Polyline]) -> Boxes:
+        return self.__get_polygons_boxes(polygons=polylines)
+
+    def __get_textboxes_boxes(self, textboxes: List[TextBox]) -> Boxes:
+        return self.__get_rectangles_boxes(rectangles=textboxes)
+
+    def __get_shapes_boxes(self, shapes: List[Shape]) -> Dict[str, Boxes]:
         shape2shapes = defaultdict(list)
 
         for shape in shapes:
-            shape2shapes[shape["shape"]].append(shape)
-
-        for shape_type, elements in shape2shapes.items():
-            if shape_type == "line":
-                x, y, w, h = self.__get_lines_bbox(lines=elements)
-            elif shape_type == "ellipse":
-                x, y, w, h = self.__get_ellipses_bbox(ellipses=elements)
-            elif shape_type == "rectangle":
-                x, y, w, h = self.__get_rectangles_bbox(rectangles=elements)
-            elif shape_type == "polygon":
-                x, y, w, h = self.__get_polygons_bbox(polygons=elements)
-            elif shape_type == "textbox":
-                x, y, w, h = self.__get_textboxes_bbox(textboxes=elements)
-            else:
-                raise ValueError(f'Unknown shape type "{shape_type}"')
-
-            if x_min is None or x < x_min:
-                x_min = x
+            shape2shapes[shape.kind].append(shape)
+
+        shape2boxes = {
+            "line": self.__get_lines_boxes,
+            "ellipse": self.__get_ellipses_boxes,
+            "rectangle": self.__get_rectangles_boxes,
+            "polygon": self.__get_polygons_boxes,
+            "polyline": self.__get_polylines_boxes,
+            "textbox": self.__get_textboxes_boxes
+        }
 
-            if y_min is None or y < y_min:
-                y_min = y
+        return {shape_type: shape2boxes[shape_type](elements) for shape_type, elements in shape2shapes.items()}
 
-            if x_max is None or x + w > x_max:
-                x_max = x + w
+    def __get_styles(self, columns: Columns) -> List[Style]:
+        keys = [key for key in self.style_keys if key in columns]
 
-            if y_max is None or y + h > y_max:
-                y_max = y + h
+        if all(columns.is_scalar(columns.columns[key]) for key in keys):
+            return [Style.from_config({key: columns.columns[key] for key in keys})] * columns.size
 
-        return x_min, y_min, x_max - x_min, y_max - y_min
+        styles = {}
+        rows = zip(*[columns.values(key) for key in keys])
+        return [styles[row] if row in styles else styles.setdefault(row, Style.from_config(dict(zip(keys, row)))) for row in rows]
 
-    def __get_text_formatting(self, formatting: dict) -> dict:
-        text_attributes = {"dirty": "0", "sz": self.__get_font_size(formatting["size"])}
+    def __get_text_formatting(self, textbox: TextBox) -> dict:
+        text_attributes = {"dirty": "0", "sz": self.__get_font_size(textbox.size)}
 
-        if formatting.get("bold", False):
+        if textbox.bold:
             text_attributes["b"] = "1"
 
-        if formatting.get("italic", False):
+        if textbox.italic:
             text_attributes["i"] = "1"
 
-        if formatting.get("underline", False):
+        if textbox.underline:
             text_attributes["u"] = "sng"
 
-        if formatting.get("strike", False):
+        if textbox.strike:
             text_attributes["strike"] = "sngStrike"
 
         return text_attributes
@@ -479,6 +3057,24 @@ class Presentation:
     def __get_coordinate(self, coordinate: float) -> str:
         return str(round(coordinate * 360000))
 
+    def __get_coordinates(self, coordinates: Values) -> List[str]:
+        return self.__get_rounded(coordinates, scale=360000)
+
+    def __get_angles(self, angles: Values) -> List[str]:
+        return self.__get_rounded(angles, scale=60000)
+
+    def __get_radius_fractions(self, radiuses: Values) -> List[str]:
+        if isinstance(radiuses, list):
+            return [self.__get_fraction(radius / 2) for radius in radiuses]
+
+        return self.__get_rounded(np.clip(np.asarray(radiuses) / 2, 0.0, 1.0), scale=100000)
+
+    def __get_rounded(self, values: Values, scale: float) -> List[str]:
+        if isinstance(values, list):
+            return [str(round(value * scale)) for value in values]
+
+        return list(map(str, np.rint(np.asarray(values) * scale).astype(np.int64).tolist()))
+
     def __get_size(self, size: float) -> str:
         return str(round(size * 12700))
 
@@ -489,7 +3085,9 @@ class Presentation:
         alignment2pptx = {"center": "ctr", "left": "l", "right": "r", "top": "t", "bottom": "b"}
         return alignment2pptx[alignment]
 
-    def __get_color(self, color: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def __get_color(color: str) -> str:
         if color.startswith("#"):
             color = color[1:]
 
@@ -528,5 +3126,59 @@ class Presentation:
     def __get_angle(self, angle: float) -> str:
         return str(round(angle * 60000))
 
-    def __get_diameter(self, ellipse: dict, key: str) -> float:
-        return ellipse[key] if key in ellipse else ellipse["d"]
+    def __get_record(self, shape: Union[dict, Shape], record_type: Optional[Type[Shape]] = None) -> Shape:
+        if isinstance(shape, dict):
+            if record_type is None and shape["shape"] not in self.record_types:
+                raise ValueError(f'Unknown shape type "{shape["shape"]}"')
+
+            return (record_type or self.record_types[shape["shape"]]).from_dict(shape)
+
+        if not isinstance(shape, record_type or tuple(self.record_types.values())):
+            raise TypeError(f"Expected {record_type.__name__ if record_type else 'a shape'} or dict, got {type(shape).__name__}")
+
+        return shape
+
+
+class AsyncPresentation:
+    def __init__(self, presentation: Presentation, executor: Optional[Executor] = None) -> None:
+        self.presentation = presentation
+        self.executor = executor
+        self.lock = asyncio.Lock()
+
+    @classmethod
+    async def load(cls: Type["AsyncPresentation"], presentation_path: Union[str, BinaryIO], executor: Optional[Executor] = None, **options: object) -> "AsyncPresentation":
+        presentation = await asyncio.get_running_loop().run_in_executor(executor, partial(Presentation, presentation_path, **options))
+        return cls(presentation, executor=executor)
+
+    async def save(self, path: Union[str, BinaryIO], compresslevel: int = 9) -> None:
+        await self.run(self.presentation.save, path, compresslevel=compresslevel)
+
+    async def export_slide(self, slide: str = "slide1") -> bytes:
+        return await self.run(self.presentation.export_slide, slide)
+
+    async def render_slides(self, builder: Callable[[Presentation, str], None], slides: Sequence[str], processes: Optional[int] = None) -> None:
+        await self.run(self.presentation.render_slides, builder, slides, processes=processes)
+
+    async def run(self, function: Callable[..., T], *args: object, **kwargs: object) -> T:
+        async with self.lock:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, partial(function, *args, **kwargs))
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[object]]:
+        if not name.startswith("add_"):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        return partial(self.run, getattr(self.presentation, name))
+
+
+def render_slide(task: Tuple[str, Dict[str, bytes], Callable[[Presentation, str], None], dict]) -> Tuple[str, bytes]:
+    slide, parts, builder, options = task
+
+    source = io.BytesIO()
+    with zipfile.ZipFile(source, "w") as f:
+        for name, part in parts.items():
+            f.writestr(name, part)
+
+    source.seek(0)
+    presentation = Presentation(source, **options)
+    builder(presentation, slide)
+    return slide, presentation.export_slide(slide)
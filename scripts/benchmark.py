@@ -0,0 +1,56 @@
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from presentation import Presentation
+
+
+def make_shapes(count: int) -> List[dict]:
+    shapes = []
+
+    for i in range(count):
+        x, y = random.uniform(0, 30), random.uniform(0, 15)
+        style = {"fill": "#7699d4", "stroke": "#222", "thickness": 0.5, "rotate": random.choice([0, 15, 45])}
+
+        if i % 5 == 0:
+            shapes.append({"shape": "line", "x1": x, "y1": y, "x2": x + 1, "y2": y + 2, "stroke": "#222", "thickness": 0.5})
+        elif i % 5 == 1:
+            shapes.append({"shape": "ellipse", "x": x, "y": y, "d": 0.2, **style})
+        elif i % 5 == 2:
+            shapes.append({"shape": "rectangle", "x": x, "y": y, "w": 0.5, "h": 0.3, "radius": 0.1, **style})
+        elif i % 5 == 3:
+            shapes.append({"shape": "polygon", "points": [{"x": x, "y": y}, {"x": x + 1, "y": y}, {"x": x + 0.5, "y": y + 1}], **style})
+        else:
+            shapes.append({"shape": "textbox", "x": x, "y": y, "w": 2, "h": 1, "text": "label", "size": 12, "align": "center", **style})
+
+    return shapes
+
+
+def measure(name: str, function: Callable[[dict], None], shapes: List[dict]) -> None:
+    start = time.perf_counter()
+
+    for shape in shapes:
+        function(shape)
+
+    elapsed = time.perf_counter() - start
+    print(f"{name:>10}: {len(shapes):>7} shapes, {elapsed:.3f} s, {elapsed / len(shapes) * 1e6:.1f} us/shape")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure per-shape build cost of Presentation.make_* methods")
+    parser.add_argument("--template", default="empty.pptx", help="path to the pptx template")
+    parser.add_argument("--count", type=int, default=20000, help="number of shapes of each type")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    presentation = Presentation(presentation_path=args.template)
+    shapes = make_shapes(count=args.count * 5)
+
+    for shape_type in ("line", "ellipse", "rectangle", "polygon", "textbox"):
+        measure(shape_type, presentation.make_shape, [shape for shape in shapes if shape["shape"] == shape_type])
+
+
+if __name__ == "__main__":
+    main()
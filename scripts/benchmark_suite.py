@@ -0,0 +1,267 @@
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, TextIO, Tuple, TypeVar
+
+from lxml import etree
+from presentation import BBoxEngine, Boxes, LabelPlacer, Presentation, SpatialIndex
+
+T = TypeVar("T")
+
+PHASES = ("make", "bbox", "add", "serialize", "save")
+PALETTE = ["#7699d4", "#dd7373", "#89dd73", "#f0c419", "#222222"]
+
+
+def get_rss() -> int:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryMonitor:
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.start_rss = 0
+        self.peak_rss = 0
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "MemoryMonitor":
+        self.start_rss = self.peak_rss = get_rss()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.__sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stopped.set()
+        self.thread.join()
+        self.peak_rss = max(self.peak_rss, get_rss())
+
+    @property
+    def peak(self) -> int:
+        return self.peak_rss - self.start_rss
+
+    def __sample(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, get_rss())
+
+
+def make_ellipses(count: int) -> List[dict]:
+    return [{"x": random.uniform(0, 30), "y": random.uniform(0, 15), "d": 0.1, "fill": random.choice(PALETTE), "fill-opacity": 0.5} for _ in range(count)]
+
+
+def make_lines(count: int) -> List[dict]:
+    lines = []
+
+    for _ in range(count):
+        x, y = random.uniform(0, 30), random.uniform(0, 15)
+        lines.append({"x1": x, "y1": y, "x2": x + random.uniform(-2, 2), "y2": y + random.uniform(-2, 2), "stroke": random.choice(PALETTE), "thickness": 0.5})
+
+    return lines
+
+
+def make_rectangles(count: int) -> List[dict]:
+    rectangles = []
+
+    for _ in range(count):
+        rectangles.append({"x": random.uniform(0, 30), "y": random.uniform(0, 15), "w": 0.4, "h": random.uniform(0.1, 3), "fill": random.choice(PALETTE), "stroke": "#222"})
+
+    return rectangles
+
+
+def make_polygons(count: int) -> List[dict]:
+    polygons = []
+
+    for _ in range(count):
+        x, y = random.uniform(0, 30), random.uniform(0, 15)
+        points = [{"x": x + random.uniform(-1, 1), "y": y + random.uniform(-1, 1)} for _ in range(random.randint(3, 8))]
+        polygons.append({"points": points, "fill": random.choice(PALETTE), "fill-opacity": 0.5, "stroke": "#222", "thickness": 0.5})
+
+    return polygons
+
+
+def get_lines_boxes(bbox: BBoxEngine, lines: List[dict]) -> Boxes:
+    return bbox.lines(x1=[line["x1"] for line in lines], y1=[line["y1"] for line in lines], x2=[line["x2"] for line in lines], y2=[line["y2"] for line in lines])
+
+
+def get_ellipses_boxes(bbox: BBoxEngine, ellipses: List[dict]) -> Boxes:
+    x, y, d = [ellipse["x"] for ellipse in ellipses], [ellipse["y"] for ellipse in ellipses], [ellipse["d"] for ellipse in ellipses]
+    return bbox.ellipses(x=x, y=y, dx=d, dy=d, rotate=[0] * len(ellipses))
+
+
+def get_rectangles_boxes(bbox: BBoxEngine, rectangles: List[dict]) -> Boxes:
+    x, y = [rectangle["x"] for rectangle in rectangles], [rectangle["y"] for rectangle in rectangles]
+    w, h = [rectangle["w"] for rectangle in rectangles], [rectangle["h"] for rectangle in rectangles]
+    return bbox.rectangles(x=x, y=y, w=w, h=h, rotate=[0] * len(rectangles))
+
+
+def get_polygons_boxes(bbox: BBoxEngine, polygons: List[dict]) -> Boxes:
+    x = [point["x"] for polygon in polygons for point in polygon["points"]]
+    y = [point["y"] for polygon in polygons for point in polygon["points"]]
+    return bbox.polygons(x=x, y=y, sizes=[len(polygon["points"]) for polygon in polygons], rotate=[0] * len(polygons))
+
+
+WORKLOADS: Dict[str, tuple] = {
+    "scatter": (make_ellipses, "make_ellipse", get_ellipses_boxes),
+    "network": (make_lines, "make_line", get_lines_boxes),
+    "histogram": (make_rectangles, "make_rectangle", get_rectangles_boxes),
+    "polygons": (make_polygons, "make_polygon", get_polygons_boxes),
+}
+
+
+def get_group_box(bbox: BBoxEngine, get_boxes: Callable[[BBoxEngine, List[dict]], Boxes], items: List[dict]) -> Tuple[float, float, float, float]:
+    return bbox.union(get_boxes(bbox, items))
+
+
+def add_group(presentation: Presentation, box: Tuple[float, float, float, float], nodes: List[etree.Element], slide: str) -> None:
+    x, y, width, height = box
+    presentation.add_group(presentation.make_group(x, y, width, height), children=nodes, slide=slide)
+
+
+def measure(phases: Dict[str, dict], phase: str, function: Callable[..., T], *args: object, **kwargs: object) -> T:
+    gc.collect()
+
+    with MemoryMonitor() as monitor:
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+
+    phases[phase]["seconds"] += elapsed
+    phases[phase]["peak_memory"] = max(phases[phase]["peak_memory"], monitor.peak)
+    phases[phase]["peak_rss"] = max(phases[phase]["peak_rss"], monitor.peak_rss)
+    return result
+
+
+def run(workload: str, shapes: int, slides: int, template: str, seed: int, compresslevel: int) -> dict:
+    random.seed(seed)
+    generate, make_name, get_boxes = WORKLOADS[workload]
+
+    presentation = Presentation(presentation_path=template)
+    slide_names = [presentation.add_slide() for _ in range(slides)]
+    make = getattr(presentation, make_name)
+
+    phases = {phase: {"seconds": 0.0, "peak_memory": 0, "peak_rss": 0} for phase in PHASES}
+    start_rss = get_rss()
+    xml_size = 0
+
+    for i, slide in enumerate(slide_names):
+        items = generate(shapes // slides + (1 if i < shapes % slides else 0))
+        if not items:
+            continue
+
+        nodes = measure(phases, "make", list, map(make, items))
+        box = measure(phases, "bbox", get_group_box, presentation.bbox, get_boxes, items)
+        measure(phases, "add", add_group, presentation, box, nodes, slide)
+        xml_size += len(measure(phases, "serialize", presentation.export_slide, slide))
+        del nodes, items
+
+    output = io.BytesIO()
+    measure(phases, "save", presentation.save, output, compresslevel=compresslevel)
+
+    return {
+        "workload": workload,
+        "shapes": shapes,
+        "slides": slides,
+        "seed": seed,
+        "compresslevel": compresslevel,
+        "phases": phases,
+        "seconds": sum(phase["seconds"] for phase in phases.values()),
+        "peak_memory": max(phase["peak_rss"] for phase in phases.values()) - start_rss,
+        "xml_bytes": xml_size,
+        "file_bytes": len(output.getvalue()),
+        "python": platform.python_version(),
+        "lxml": ".".join(map(str, etree.LXML_VERSION)),
+        "vectorized": presentation.bbox.vectorized,
+    }
+
+
+def run_labels(count: int, width: float, height: float, area: Tuple[float, float], obstacles: bool, placement: str, seed: int) -> dict:
+    random.seed(seed)
+    points = [(random.uniform(0, area[0]), random.uniform(0, area[1])) for _ in range(count)]
+    index = None
+
+    if obstacles:
+        index = SpatialIndex()
+        for i, (x, y) in enumerate(points):
+            index.insert(i, (x - 0.05, y - 0.05, x + 0.05, y + 0.05))
+
+    placer = LabelPlacer(obstacles=index)
+    labels = [(x, y, width, height) for x, y in points]
+
+    gc.collect()
+    start = time.perf_counter()
+    overlapped = placer.place(labels, anneal=placement == "anneal")
+    elapsed = time.perf_counter() - start
+
+    return {
+        "workload": "labels",
+        "labels": count,
+        "label_size": [width, height],
+        "area": list(area),
+        "coverage": count * width * height / (area[0] * area[1]),
+        "obstacles": obstacles,
+        "placement": placement,
+        "seed": seed,
+        "seconds": elapsed,
+        "overlapped": sum(overlapped),
+        "python": platform.python_version(),
+    }
+
+
+def execute(function: Callable[..., dict], config: tuple, in_process: bool) -> dict:
+    if in_process:
+        return function(*config)
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(function, *config).result()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure time and peak memory of build, group, serialize and save phases")
+    parser.add_argument("--template", default="empty.pptx", help="path to the pptx template")
+    parser.add_argument("--workloads", nargs="+", default=list(WORKLOADS), choices=list(WORKLOADS), help="workloads to run")
+    parser.add_argument("--shapes", nargs="+", type=int, default=[1000, 10000, 100000], help="total number of shapes (e.g. 1000 10000 100000 1000000)")
+    parser.add_argument("--slides", nargs="+", type=int, default=[1, 10], help="number of slides the shapes are spread over (e.g. 1 10 100 500)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--compresslevel", type=int, default=9, help="deflate level used by save")
+    parser.add_argument("--output", default=None, help="path to the JSON lines output (stdout by default)")
+    parser.add_argument("--labels", nargs="*", type=int, default=[10000], help="number of labels to place (none to skip)")
+    parser.add_argument("--label-sizes", nargs="+", default=["0.2x0.1", "1x0.4", "2x0.5"], help="label sizes in cm as WxH (e.g. 0.2x0.1 1x0.4 2x0.5)")
+    parser.add_argument("--label-area", nargs=2, type=float, default=[30, 15], metavar=("W", "H"), help="size of the area the anchors are spread over in cm")
+    parser.add_argument("--in-process", action="store_true", help="run every configuration in this process instead of a fresh one")
+    args = parser.parse_args()
+
+    output: TextIO = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8")
+
+    try:
+        for workload in args.workloads:
+            for shapes in args.shapes:
+                for slides in args.slides:
+                    config = (workload, shapes, slides, args.template, args.seed, args.compresslevel)
+                    print(json.dumps(execute(run, config, in_process=args.in_process)), file=output, flush=True)
+
+        for count in args.labels:
+            for size in args.label_sizes:
+                for placement in ("greedy", "anneal"):
+                    for obstacles in (False, True):
+                        config = (count, *map(float, size.split("x")), tuple(args.label_area), obstacles, placement, args.seed)
+                        print(json.dumps(execute(run_labels, config, in_process=args.in_process)), file=output, flush=True)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import io
+import os
+import unittest
+import zipfile
+from unittest import mock
+
+from lxml import etree
+from presentation import Package, Presentation
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "empty.pptx")
+
+
+class TestPresentation(unittest.TestCase):
+    def test_add_group_shape_ids(self) -> None:
+        presentation = Presentation(TEMPLATE)
+        ellipses = [presentation.make_ellipse({"x": i, "y": i, "d": 1, "fill": "#222"}) for i in range(3)]
+        presentation.add_group(presentation.make_group(0, 0, 3, 3), ellipses)
+        presentation.add_ellipses([{"x": 5, "y": 5, "d": 1, "fill": "#222"}])
+
+        output = io.BytesIO()
+        presentation.save(output)
+
+        with zipfile.ZipFile(output) as package:
+            root = etree.fromstring(package.read("ppt/slides/slide1.xml"))
+
+        ids = [node.get("id") for node in root.iter("{http://schemas.openxmlformats.org/presentationml/2006/main}cNvPr")]
+        self.assertEqual(len(ids), len(set(ids)), ids)
+
+    def test_streaming_matches_tree(self) -> None:
+        slides = []
+
+        for streaming in (False, True):
+            presentation = Presentation(TEMPLATE, streaming=streaming)
+            presentation.add_ellipses([{"x": i, "y": i, "d": 1, "fill": "#222"} for i in range(10)])
+            presentation.add_group(presentation.make_group(0, 0, 3, 3), [presentation.make_ellipse({"x": 1, "y": 1, "d": 1, "fill": "#222"})])
+
+            output = io.BytesIO()
+            presentation.save(output)
+
+            with zipfile.ZipFile(output) as package:
+                slides.append(package.read("ppt/slides/slide1.xml"))
+
+        tree, stream = (etree.tostring(etree.fromstring(slide), method="c14n") for slide in slides)
+        self.assertEqual(tree, stream)
+        self.assertEqual(slides[1].count(b"xmlns:p="), 1)
+
+    def test_save_round_trip(self) -> None:
+        contents = []
+
+        for raw_writes in (True, False):
+            with mock.patch.object(Package, "raw_writes", raw_writes):
+                presentation = Presentation(TEMPLATE)
+                presentation.add_ellipses([{"x": i, "y": i, "d": 1, "fill": "#222"} for i in range(10)])
+
+                output = io.BytesIO()
+                presentation.save(output)
+
+            with zipfile.ZipFile(output) as package:
+                self.assertIsNone(package.testzip())
+                contents.append({name: package.read(name) for name in package.namelist()})
+
+        with zipfile.ZipFile(TEMPLATE) as template:
+            for name in template.namelist():
+                if name != "ppt/slides/slide1.xml":
+                    self.assertEqual(contents[0][name], template.read(name), name)
+
+        self.assertEqual(contents[0], contents[1])
+
+
+if __name__ == "__main__":
+    unittest.main()